@@ -6,73 +6,300 @@ Extracted from production_agi_voicebot.py
 
 import sys
 import os
+import select
+import socket
+import socketserver
+import re
 import time
-import uuid
 import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from ami_client import AMITalkListener
+from audio_utils import (MonitorTail, ModifyWatch, EnergyVAD, unique_suffix, stat_size,
+                         start_temp_reaper, TTS_SOUND_DIR, TEMP_PREFIXES, SCRATCH_DIR,
+                         SCRATCH_PREFIXES)
+from config import AMI_CONFIG, CONVERSATION_CONFIG, DIALPLAN_CONFIG, PATHS
 
 logger = logging.getLogger(__name__)
 
+SOUND_EXTENSIONS = ('.wav', '.sln16')
+
+# Recordings go to RAM-backed storage - no block-device writeback per turn
+MONITOR_DIR = PATHS["asterisk_monitor"]
+try:
+    os.makedirs(MONITOR_DIR)
+    # makedirs' mode is masked by the umask - Asterisk writes here, so set group write explicitly
+    os.chmod(MONITOR_DIR, 0o775)
+except FileExistsError:
+    pass
+except OSError as e:
+    logger.warning(f"Cannot create monitor dir {MONITOR_DIR}: {e}")
+
+@functools.lru_cache(maxsize=1)
+def _sound_index():
+    """Scan the sounds directory once: {name: (path, size)}, WAV preferred"""
+    index = {}
+    try:
+        with os.scandir(PATHS["asterisk_sounds"]) as entries:
+            for entry in entries:
+                name, ext = os.path.splitext(entry.name)
+                # Per-call TTS files come and go - they are looked up directly
+                if ext not in SOUND_EXTENSIONS or name.startswith('tts_'):
+                    continue
+                if ext == '.wav' or name not in index:
+                    index[name] = (entry.path, entry.stat().st_size)
+    except OSError as e:
+        logger.warning(f"Sound directory scan failed: {e}")
+    logger.info("Sound index built: %s prompts", len(index))
+    return index
+
+def _lookup_sound(name):
+    """Return (path, size) for a sound name or absolute base path, or None if no playable file exists"""
+    if name.startswith('/'):
+        prefix = name          # TTS prompt on tmpfs - not part of the sounds index
+    else:
+        hit = _sound_index().get(name)
+        if hit:
+            return hit
+        prefix = f"{PATHS['asterisk_sounds']}/{name}"
+
+    for ext in SOUND_EXTENSIONS:
+        path = prefix + ext
+        try:
+            return path, os.stat(path).st_size
+        except FileNotFoundError:
+            continue
+    return None
+
+# Status, result code and hangup marker of a response line in a single scan
+_AGI_RE = re.compile(rb'^(?P<ok>200)(?: result=(?P<rc>-?\d+))?|(?P<hangup>hangup)', re.IGNORECASE)
+
+class AGIResponse(str):
+    """Decoded AGI response line carrying ok/rc/hangup parsed once"""
+    ok = False
+    rc = None
+    hangup = False
+
+    @classmethod
+    def parse(cls, raw):
+        resp = cls(raw.decode('utf-8', 'replace'))
+        m = _AGI_RE.search(raw)
+        if m:
+            if m.group('hangup'):
+                resp.hangup = True
+            else:
+                resp.ok = True
+                if m.group('rc') is not None:
+                    resp.rc = int(m.group('rc'))
+                    resp.hangup = resp.rc == -1
+        return resp
+
+AGI_ERROR = AGIResponse("ERROR")
+
+class AGIReader:
+    """
+    Buffered line reader over the AGI input fd with select()-bounded waits.
+    Reads land in one preallocated chunk buffer; consumed lines advance an
+    offset instead of shifting the buffer.
+    """
+
+    def __init__(self, fd, buffer_size=8192):
+        self.fd = fd
+        self._chunk = bytearray(buffer_size)
+        self._buf = bytearray()
+        self._pos = 0
+
+    def readline(self, timeout=None):
+        """Return one line (bytes), b'' on EOF, or None if timeout expires first"""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            end = self._buf.find(b'\n', self._pos)
+            if end >= 0:
+                with memoryview(self._buf) as view:
+                    line = view[self._pos:end + 1].tobytes()
+                self._pos = end + 1
+                if self._pos == len(self._buf):
+                    self._buf.clear()
+                    self._pos = 0
+                return line
+
+            # Only touch the fd when no complete (pipelined) line is buffered
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                ready, _, _ = select.select([self.fd], [], [], remaining)
+                if not ready:
+                    return None
+
+            n = os.readv(self.fd, [self._chunk])
+            if not n:
+                line = bytes(self._buf[self._pos:])
+                self._buf.clear()
+                self._pos = 0
+                return line
+            with memoryview(self._chunk) as view:
+                self._buf += view[:n]
+
 class SimpleAGI:
     """Minimal AGI with correct command syntax"""
 
-    def __init__(self):
+    # Upper bound for verbs that return immediately (status, exec, answer...)
+    RESPONSE_TIMEOUT = 30.0
+
+    # Byte templates/literals for the per-turn verbs - written to stdout without a codec pass
+    _STREAM_TMPL = b'STREAM FILE %s ""'
+    _RECORD_TMPL = b'RECORD FILE %s wav "#" %d 0 2'
+    _MIXMON_TMPL = b'EXEC MixMonitor %s.wav'
+    _CMD_STOP_MIXMON = b'EXEC StopMixMonitor'
+    _CMD_CHANNEL_STATUS = b'CHANNEL STATUS'
+    _CMD_ANSWER = b'ANSWER'
+    _CMD_HANGUP = b'HANGUP'
+    _CMD_TALK_DETECT_SET = f'EXEC Set TALK_DETECT(set)={AMI_CONFIG["talk_detect"]}'.encode()
+    _CMD_TALK_DETECT_REMOVE = b'EXEC Set TALK_DETECT(remove)='
+
+    # Adaptive barge-in window: shrink while clean, back off on false positives
+    VAD_WINDOW_INITIAL_MS = 80
+    VAD_WINDOW_MIN_MS = 40
+    VAD_WINDOW_MAX_MS = 250
+    VAD_CLEAN_CHUNKS_TO_SHRINK = 5
+
+    def __init__(self, in_fd=None, out=None):
+        """Classic AGI on stdin/stdout by default; FastAGI passes a socket fd + writer"""
         self.env = {}
         self.connected = True
         self.call_answered = False
+        self._vad_window_ms = self.VAD_WINDOW_INITIAL_MS
+        self._clean_chunks = 0
+        self._prefetcher = None
+        self.noise_floor = None  # caller line RMS, calibrated by the first recorded turn
+        # One buffered reader for the whole session - env block and responses
+        self._in = AGIReader(sys.stdin.fileno() if in_fd is None else in_fd)
+        self._out = sys.stdout.buffer if out is None else out
         self._parse_env()
 
-    def _start_mixmonitor(self, rec_basename):
+        # Hangups and crashes skip per-call cleanup - sweep their leftovers in the background
+        start_temp_reaper(((MONITOR_DIR, TEMP_PREFIXES), (TTS_SOUND_DIR, TEMP_PREFIXES),
+                           (SCRATCH_DIR, SCRATCH_PREFIXES)))
+
+        # Persistent AMI connection for event-driven barge-in (MixMonitor fallback),
+        # opened on the first response so login never delays answering the call
+        self.talk_listener = None
+        self._ami_attempted = False
+
+    @classmethod
+    def serve_fastagi(cls, handler, host, port):
+        """
+        Run a FastAGI server: one long-lived process, one thread per call.
+        handler(agi) runs the call on a SimpleAGI bound to the connection.
+        """
+        class _CallHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                agi = cls(in_fd=self.connection.fileno(), out=self.wfile)
+                try:
+                    handler(agi)
+                except Exception as e:
+                    logger.error(f"FastAGI call handler failed: {e}")
+                finally:
+                    agi.close()
+
+        class _Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+
+        with _Server((host, port), _CallHandler) as server:
+            logger.info("FastAGI listening on %s:%s", host, port)
+            server.serve_forever()
+
+    def start_mixmonitor(self, rec_basename):
         # rec_basename without extension; Asterisk will add .wav
-        return self.command(f'EXEC MixMonitor {rec_basename}.wav')
+        return self.command(self._MIXMON_TMPL % rec_basename.encode())
 
-    def _stop_mixmonitor(self):
-        return self.command('EXEC StopMixMonitor')
+    def stop_mixmonitor(self):
+        return self.command(self._CMD_STOP_MIXMON)
 
     def _parse_env(self):
         """Parse AGI environment"""
         env_count = 0
         while True:
-            line = sys.stdin.readline()
+            line = self._in.readline().decode('utf-8', 'replace')
             if not line or not line.strip():
                 break
             if ':' in line:
                 key, value = line.split(':', 1)
                 self.env[key.strip()] = value.strip()
                 env_count += 1
-        logger.info(f"AGI env parsed: {env_count} vars")
+        logger.info("AGI env parsed: %s vars", env_count)
 
-    def command(self, cmd):
-        """Send AGI command"""
-        try:
-            logger.debug(f"AGI: {cmd}")
-            print(cmd)
-            sys.stdout.flush()
+    def _read_response(self, timeout=RESPONSE_TIMEOUT):
+        """Read one AGI response line and track hangup state"""
+        raw = self._in.readline(timeout)
+        if raw is None:
+            logger.error(f"AGI response timeout after {timeout}s - treating call as lost")
+            self.connected = False
+            return AGI_ERROR
 
-            result = sys.stdin.readline().strip()
-            logger.debug(f"Response: {result}")
+        raw = raw.strip()
+        logger.debug("Response: %s", raw)
+
+        resp = AGIResponse.parse(raw)
+        if resp.hangup:
+            logger.info("Hangup detected via AGI response")
+            self.connected = False
+        return resp
 
-            # Detect hangup scenarios
-            if result.startswith('200 result=-1') or 'hangup' in result.lower():
-                logger.info("Hangup detected via AGI response")
-                self.connected = False
+    def command(self, cmd, timeout=RESPONSE_TIMEOUT):
+        """
+        Send AGI command (str or pre-encoded bytes) - timeout=None waits as
+        long as playback/recording runs
+        """
+        try:
+            if isinstance(cmd, str):
+                cmd = cmd.encode('utf-8')
+            logger.debug("AGI: %s", cmd)
+            self._out.write(cmd + b'\n')
+            self._out.flush()
 
-            return result
+            return self._read_response(timeout)
         except Exception as e:
             logger.error(f"AGI command failed: {e}")
             self.connected = False
-            return "ERROR"
+            return AGI_ERROR
 
-    def answer(self):
-        """Answer call"""
-        # Check if call is already answered
-        status_result = self.command("CHANNEL STATUS")
-        if "result=6" in status_result:  # Already answered
+    def command_batch(self, cmds, timeout=RESPONSE_TIMEOUT):
+        """
+        Send several AGI commands with a single write + flush, then read
+        one response per command. Returns the responses in order.
+        """
+        try:
+            logger.debug("AGI batch: %s", cmds)
+            self._out.write(b''.join(
+                (cmd if isinstance(cmd, bytes) else cmd.encode('utf-8')) + b'\n' for cmd in cmds
+            ))
+            self._out.flush()
+
+            return [self._read_response(timeout) for _ in cmds]
+        except Exception as e:
+            logger.error(f"AGI batch failed: {e}")
+            self.connected = False
+            return [AGI_ERROR] * len(cmds)
+
+    def answer(self, banner=None):
+        """Answer call - status check, ANSWER and optional banner in one batch"""
+        cmds = [self._CMD_CHANNEL_STATUS, self._CMD_ANSWER]
+        if banner:
+            cmds.append(f'VERBOSE "{banner}"')
+        status_result, result = self.command_batch(cmds)[:2]
+
+        # ANSWER on an already answered channel is a harmless no-op
+        if status_result.rc == 6:
             logger.info("Call already answered")
             self.call_answered = True
             return True
 
-        result = self.command("ANSWER")
-        success = result and result.startswith('200')
+        success = result.ok
         if success:
             self.call_answered = True
             logger.info("Call answered successfully")
@@ -82,47 +309,51 @@ class SimpleAGI:
 
     def hangup(self):
         """Hangup call"""
-        self.command("HANGUP")
+        self.command(self._CMD_HANGUP)
         self.connected = False
 
+    def close(self):
+        """Release per-call resources (AMI listener, prefetch thread); safe to call twice"""
+        if self.talk_listener:
+            self.talk_listener.close()
+            self.talk_listener = None
+        if self._prefetcher:
+            self._prefetcher.shutdown(wait=False)
+            self._prefetcher = None
+
     def verbose(self, msg):
         """Verbose message"""
         return self.command(f'VERBOSE "{msg}"')
 
     def stream_file(self, filename):
         """Play audio file - NO QUOTES on filename"""
-        if '.' in filename:
-            filename = filename.rsplit('.', 1)[0]
-
-        # Check for both WAV and SLIN16 files in root sounds directory
-        wav_path = f"/usr/share/asterisk/sounds/{filename}.wav"
-        sln16_path = f"/usr/share/asterisk/sounds/{filename}.sln16"
-
-        if os.path.exists(wav_path):
-            file_size = os.path.getsize(wav_path)
-            logger.info(f"Playing WAV: {filename} (file exists: {file_size} bytes)")
-        elif os.path.exists(sln16_path):
-            file_size = os.path.getsize(sln16_path)
-            logger.info(f"Playing SLIN16: {filename} (file exists: {file_size} bytes)")
+        filename = os.path.splitext(filename)[0]
+
+        # Check for WAV or SLIN16 in root sounds directory (cached index)
+        sound = _lookup_sound(filename)
+        if sound:
+            path, file_size = sound
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Playing %s: %s (file exists: %d bytes)",
+                            path.rsplit('.', 1)[1].upper(), filename, file_size)
         else:
-            logger.error(f"Audio file not found: {wav_path} or {sln16_path}")
+            logger.error("Audio file not found: %s (.wav/.sln16)", filename)
 
-        result = self.command(f'STREAM FILE {filename} ""')
-        success = result and result.startswith('200')
-        logger.info(f"Stream file result: {result} (success: {success})")
+        result = self.command(self._STREAM_TMPL % filename.encode(), timeout=None)
+        success = result.ok
+        logger.info("Stream file result: %s (success: %s)", result, success)
         return success
 
     def play_with_voice_interrupt(self, filename, asr_client):
         """Play audio with simple barge-in detection - no hangup issues"""
-        if '.' in filename:
-            filename = filename.rsplit('.', 1)[0]
+        filename = os.path.splitext(filename)[0]
 
-        logger.info(f"Playing with voice interrupt (simplified): {filename}")
+        logger.info("Playing with voice interrupt (simplified): %s", filename)
 
         # Simple approach: Just play the file normally first
         # This eliminates complex monitoring that was causing hangups
-        result = self.command(f'STREAM FILE {filename} ""')
-        success = result and result.startswith('200')
+        result = self.command(self._STREAM_TMPL % filename.encode(), timeout=None)
+        success = result.ok
 
         if success:
             logger.info("Greeting completed successfully")
@@ -131,63 +362,217 @@ class SimpleAGI:
             logger.warning(f"Playback had issues: {result}")
             return False, None
         
-    def play_response_with_barge_in(self, chunk_filenames, vad_window_ms=250):
+    def play_response_with_barge_in(self, chunk_filenames, vad_window_ms=None):
         """
         Plays short audio chunks (filenames may include .wav/.sln16 or bare name).
-        Between chunks, quickly checks MixMonitor file growth (~vad_window_ms).
+        Between chunks, waits up to vad_window_ms for caller speech - TALK_DETECT
+        events over AMI when connected, MixMonitor file growth otherwise.
+        vad_window_ms=None uses the per-call adaptive window.
         If caller speech is detected, stops further playback and returns.
         Returns (played_all, detected_speech).
         """
-        rec_id = f"mm_{int(time.time())}_{uuid.uuid4().hex[:4]}"
-        rec_base = f"/var/spool/asterisk/monitor/{rec_id}"
-        rec_path = f"{rec_base}.wav"
-        self._start_mixmonitor(rec_base)
+        if DIALPLAN_CONFIG["chunk_subroutine"]:
+            return self._play_chunks_subroutine(chunk_filenames, vad_window_ms)
+        if self._connect_talk_listener():
+            return self._play_chunks_talk_detect(chunk_filenames, vad_window_ms)
+        return self._play_chunks_mixmonitor(chunk_filenames, vad_window_ms)
+
+    def _connect_talk_listener(self):
+        """Log in to AMI once per call, on first use - True if the listener is up"""
+        if not self._ami_attempted:
+            self._ami_attempted = True
+            listener = AMITalkListener(self.env.get('agi_channel', ''))
+            if listener.connect():
+                self.talk_listener = listener
+        return self.talk_listener is not None
+
+    @staticmethod
+    def _prepare_chunk(chunks):
+        """Pull the next chunk name and resolve its sound file - runs on the prefetch thread"""
+        fname = next(chunks, None)
+        if fname is None:
+            return None
+        base = os.path.splitext(fname)[0]
+        return base, _lookup_sound(base)
+
+    def _iter_chunks(self, chunk_filenames):
+        """
+        Yield (base, sound) per chunk. Chunk N+1 is fetched (and, for generator
+        input, synthesized) on a worker thread while chunk N plays.
+        """
+        if self._prefetcher is None:
+            self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunk-prefetch")
+
+        chunks = iter(chunk_filenames)
+        pending = self._prefetcher.submit(self._prepare_chunk, chunks)
+        try:
+            while True:
+                item = pending.result()
+                if item is None:
+                    return
+                pending = self._prefetcher.submit(self._prepare_chunk, chunks)
+                yield item
+        finally:
+            pending.cancel()
+
+    def _accept_barge_in(self, detected):
+        """
+        Count one chunk towards the adaptive VAD window. A detection always
+        stops playback; whether it was real is known only after the caller's
+        turn is recorded - see barge_in_outcome().
+        """
+        if detected:
+            self._clean_chunks = 0
+            return True
+
+        self._clean_chunks += 1
+        if self._clean_chunks >= self.VAD_CLEAN_CHUNKS_TO_SHRINK:
+            self._vad_window_ms = max(self.VAD_WINDOW_MIN_MS, self._vad_window_ms - 10)
+            self._clean_chunks = 0
+        return False
+
+    def barge_in_outcome(self, heard_speech):
+        """Report whether a barge-in was followed by real speech; false positives widen the window"""
+        if heard_speech:
+            return
+        self._vad_window_ms = min(self.VAD_WINDOW_MAX_MS, self._vad_window_ms + 20)
+        logger.info("Barge-in false positive - VAD window now %dms", self._vad_window_ms)
+
+    def _play_chunks_subroutine(self, chunk_filenames, vad_window_ms):
+        """Playback + WaitForNoise fused in the dialplan - one AGI round-trip per chunk"""
+        sub = DIALPLAN_CONFIG["chunk_subroutine"]
+        noise_ms = DIALPLAN_CONFIG["noise_ms"]
+        detected_speech = False
+        for base, sound in self._iter_chunks(chunk_filenames):
+            if not self.connected:
+                break
+
+            window_ms = vad_window_ms or self._vad_window_ms
+            # The timeout must cover the required noise itself plus the listen window
+            wait_s = (noise_ms + window_ms) / 1000.0
+            # GOSUB returns only after the subroutine ran, so the read is pipelined
+            gosub_res, retval = self.command_batch([
+                f'GOSUB {sub} s 1 {base},{noise_ms},{wait_s:.2f}',
+                'GET VARIABLE GOSUB_RETVAL'
+            ], timeout=None)
+            if not gosub_res.ok:
+                logger.warning("Chunk subroutine issue: %s", gosub_res)
+
+            noise = retval.endswith('(1)')
+            if self._accept_barge_in(noise):
+                logger.info("Caller speech detected (dialplan WaitForNoise)")
+                detected_speech = True
+                break
+
+        played_all = not detected_speech
+        return played_all, detected_speech
+
+    def _stream_chunk(self, base, setup=None):
+        """STREAM FILE one chunk; pending setup commands ride in the same write"""
+        stream = self._STREAM_TMPL % base.encode()
+        if setup:
+            return self.command_batch(setup + [stream], timeout=None)[-1]
+        return self.command(stream, timeout=None)
+
+    def _play_chunks_talk_detect(self, chunk_filenames, vad_window_ms):
+        """Barge-in via ChannelTalkingStart events - no filesystem polling"""
+        setup = [self._CMD_TALK_DETECT_SET]
 
         detected_speech = False
         try:
-            for fname in chunk_filenames:
+            for base, sound in self._iter_chunks(chunk_filenames):
                 if not self.connected:
                     break
 
-                # Normalize filename for STREAM FILE (no extension)
-                base = fname
-                if '.' in base:
-                    base = base.rsplit('.', 1)[0]
+                # Only talk that starts from this chunk onwards counts
+                self.talk_listener.drain()
+
+                res = self._stream_chunk(base, setup)
+                setup = None
+                if not res.ok:
+                    logger.warning("Chunk playback issue: %s", res)
+
+                # Events raised during playback are already queued on the socket
+                window_ms = vad_window_ms or self._vad_window_ms
+                talking = self.talk_listener.wait_for_talking(window_ms / 1000.0)
+                if self._accept_barge_in(talking):
+                    logger.info("Caller speech detected (TALK_DETECT)")
+                    detected_speech = True
+                    break
+
+            played_all = not detected_speech
+            return played_all, detected_speech
+        finally:
+            self.command(self._CMD_TALK_DETECT_REMOVE)
+
+    def _play_chunks_mixmonitor(self, chunk_filenames, vad_window_ms):
+        """Barge-in fallback when AMI is unavailable - energy VAD on tailed MixMonitor PCM"""
+        rec_id = f"mm_{unique_suffix()}"
+        rec_base = f"{MONITOR_DIR}/{rec_id}"
+        rec_path = f"{rec_base}.wav"
+        # MixMonitor starts in the same AGI write as the first chunk's STREAM FILE
+        setup = [self._MIXMON_TMPL % rec_base.encode()]
+
+        # One MixMonitor for the whole response, tailed through a single fd
+        tail = MonitorTail(rec_path)
+        watch = ModifyWatch(rec_path)
+        # No time to calibrate inside a barge-in window - use the call's floor if known
+        vad = EnergyVAD(threshold=CONVERSATION_CONFIG["vad_rms_threshold"],
+                        noise_floor=self.noise_floor or 0.0)
+        detected_speech = False
+        try:
+            for base, sound in self._iter_chunks(chunk_filenames):
+                if not self.connected:
+                    break
 
                 # Play one short chunk (no DTMF keys allowed)
-                res = self.command(f'STREAM FILE {base} ""')
-                ok = res and res.startswith('200')
-                if not ok:
-                    logger.warning(f"Chunk playback issue: {res}")
-
-                # Quick VAD window: ~250 ms checking MixMonitor size growth
-                end_by = time.time() + (vad_window_ms / 1000.0)
-                last_size = os.path.getsize(rec_path) if os.path.exists(rec_path) else 0
-                while time.time() < end_by:
-                    time.sleep(0.05)
-                    size = os.path.getsize(rec_path) if os.path.exists(rec_path) else 0
-                    if size > last_size + 1024:  # ~1KB growth ≈ recent caller voice
-                        detected_speech = True
+                res = self._stream_chunk(base, setup)
+                setup = None
+                if not res.ok:
+                    logger.warning("Chunk playback issue: %s", res)
+
+                # MixMonitor mixes both directions - drop the chunk we just played
+                tail.skip_to_end()
+                vad.reset()
+
+                # Quick VAD window: 20 ms RMS frames of newly recorded caller audio
+                window_ms = vad_window_ms or self._vad_window_ms
+                end_by = time.time() + (window_ms / 1000.0)
+                speech = False
+                while True:
+                    remaining = end_by - time.time()
+                    if remaining <= 0:
+                        break
+                    # Sleep in the kernel until MixMonitor actually writes
+                    if watch.wait(remaining) and vad.feed(tail.read()):
+                        speech = True
                         break
 
-                if detected_speech:
+                if self._accept_barge_in(speech):
+                    detected_speech = True
                     break
 
             played_all = not detected_speech
             return played_all, detected_speech
         finally:
-            self._stop_mixmonitor()
+            watch.close()
+            tail.close()
+            self.stop_mixmonitor()
+            try:
+                os.unlink(rec_path)
+            except OSError:
+                pass
 
 
-    def record_file(self, filename):
+    def record_file(self, filename, max_ms=15000, timeout=20.0):
         """Record audio - SIMPLE syntax without beep"""
-        result = self.command(f'RECORD FILE {filename} wav "#" 15000 0 2')
+        result = self.command(self._RECORD_TMPL % (filename.encode(), max_ms), timeout=timeout)
         # Check for hangup during recording
-        if result and 'result=-1' in result:
+        if result.hangup:
             logger.info("Hangup detected during recording")
             self.connected = False
             return False
-        return result and result.startswith('200')
+        return result.ok
 
     def sleep(self, seconds):
         """Sleep"""
@@ -203,11 +588,11 @@ class FastInterruptRecorder:
 
     def get_user_input_with_interrupt(self, timeout=10):
         """Get user input with fast interrupt capability"""
-        record_file = f"/var/spool/asterisk/monitor/user_{int(time.time())}_{uuid.uuid4().hex[:4]}"
+        record_file = f"{MONITOR_DIR}/user_{unique_suffix()}"
 
         logger.info("Listening for user input...")
         # Shorter timeout for faster responsiveness
-        result = self.agi.command(f'RECORD FILE {record_file} wav "#" {timeout * 1000} 0 2')
+        self.agi.record_file(record_file, timeout * 1000, timeout + 5)
 
         if not self.agi.connected:
             return None
@@ -215,9 +600,9 @@ class FastInterruptRecorder:
         wav_file = f"{record_file}.wav"
         transcript = ""
 
-        if os.path.exists(wav_file):
-            file_size = os.path.getsize(wav_file)
-            logger.info(f"Recording: {file_size} bytes")
+        file_size = stat_size(wav_file)
+        if file_size >= 0:
+            logger.info("Recording: %d bytes", file_size)
 
             if file_size > 300:  # Lower threshold for better detection
                 transcript = self.asr.transcribe_file(wav_file)
@@ -226,6 +611,6 @@ class FastInterruptRecorder:
             try:
                 os.unlink(wav_file)
             except Exception as e:
-                logger.debug(f"Cleanup failed: {e}")
+                logger.debug("Cleanup failed: %s", e)
 
         return transcript.strip() if transcript else None
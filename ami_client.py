@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+AMI Talk Listener - Event-driven barge-in detection
+Consumes TALK_DETECT ChannelTalkingStart events over a persistent AMI socket
+"""
+
+import socket
+import select
+import time
+import logging
+
+from config import AMI_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_ERE_SPECIAL = set('\\.[]()*+?{}|^$')
+_warned_no_secret = False
+
+
+def _ere_escape(text):
+    """Escape text for the POSIX extended regex Asterisk uses in AMI filters"""
+    return ''.join('\\' + c if c in _ERE_SPECIAL else c for c in text)
+
+
+class AMITalkListener:
+    """Persistent AMI connection reporting caller speech on a single channel"""
+
+    def __init__(self, channel, config=AMI_CONFIG):
+        self.channel = channel
+        self.config = config
+        self.sock = None
+        self._buf = b""
+
+    def connect(self):
+        """Open and authenticate the AMI connection - returns True on success"""
+        global _warned_no_secret
+        if not self.config["secret"]:
+            if not _warned_no_secret:
+                logger.warning("AMI secret not set (VOICEBOT_AMI_SECRET) - barge-in falls back "
+                               "to MixMonitor polling; see extensions_voicebot.conf for AMI setup")
+                _warned_no_secret = True
+            return False
+
+        try:
+            self.sock = socket.create_connection(
+                (self.config["host"], self.config["port"]),
+                timeout=self.config["connect_timeout"]
+            )
+            self.sock.recv(1024)  # Banner: "Asterisk Call Manager/x.y"
+
+            login = (
+                "Action: Login\r\n"
+                f"Username: {self.config['username']}\r\n"
+                f"Secret: {self.config['secret']}\r\n"
+                "Events: call\r\n\r\n"
+            )
+            self.sock.sendall(login.encode('ascii'))
+
+            reply = self._read_message(self.config["connect_timeout"])
+            if not reply or reply.get('Response') != 'Success':
+                logger.warning(f"AMI login rejected: {reply}")
+                self.close()
+                return False
+
+            # Whitelist only this channel's talk events so concurrent calls
+            # don't each receive and parse every call event on the box
+            talk_filter = f"Event: ChannelTalkingStart.*Channel: {_ere_escape(self.channel)}"
+            self.sock.sendall((
+                "Action: Filter\r\n"
+                "Operation: Add\r\n"
+                f"Filter: {talk_filter}\r\n\r\n"
+            ).encode('utf-8'))
+            reply = self._read_response(self.config["connect_timeout"])
+            if not reply or reply.get('Response') != 'Success':
+                # Still correct unfiltered - wait_for_talking checks the channel
+                logger.warning(f"AMI event filter rejected (needs write=system): {reply}")
+
+            logger.info(f"AMI talk listener connected for {self.channel}")
+            return True
+
+        except Exception as e:
+            logger.warning(f"AMI connection failed: {e}")
+            self.close()
+            return False
+
+    def _read_message(self, timeout):
+        """Read one AMI message block (or None on timeout/disconnect)"""
+        deadline = time.time() + timeout
+        while b"\r\n\r\n" not in self._buf:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            ready, _, _ = select.select([self.sock], [], [], remaining)
+            if not ready:
+                return None
+            data = self.sock.recv(4096)
+            if not data:
+                raise ConnectionError("AMI connection closed")
+            self._buf += data
+
+        block, self._buf = self._buf.split(b"\r\n\r\n", 1)
+        message = {}
+        for line in block.decode('utf-8', 'replace').split("\r\n"):
+            if ': ' in line:
+                key, value = line.split(': ', 1)
+                message[key] = value
+        return message
+
+    def _read_response(self, timeout):
+        """Read up to the next action response, skipping any events ahead of it"""
+        deadline = time.time() + timeout
+        while True:
+            message = self._read_message(max(0.0, deadline - time.time()))
+            if message is None or 'Response' in message:
+                return message
+
+    def drain(self):
+        """Discard events already queued (e.g. talk that ended before this chunk)"""
+        try:
+            while self._read_message(0.0) is not None:
+                pass
+        except Exception as e:
+            logger.warning(f"AMI drain failed: {e}")
+            self.close()
+
+    def wait_for_talking(self, timeout):
+        """Block up to timeout seconds for ChannelTalkingStart on our channel"""
+        if not self.sock:
+            return False
+
+        deadline = time.time() + timeout
+        try:
+            while True:
+                message = self._read_message(max(0.0, deadline - time.time()))
+                if message is None:
+                    return False
+                if message.get('Event') == 'ChannelTalkingStart' and message.get('Channel') == self.channel:
+                    return True
+        except Exception as e:
+            logger.warning(f"AMI event read failed: {e}")
+            self.close()
+            return False
+
+    def close(self):
+        """Log off and close the AMI socket"""
+        if not self.sock:
+            return
+        try:
+            self.sock.sendall(b"Action: Logoff\r\n\r\n")
+        except Exception:
+            pass
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+        self.sock = None
@@ -6,23 +6,445 @@ Extracted from production_agi_voicebot.py
 
 import os
 import time
-import uuid
+import ctypes
+import select
+import struct
 import subprocess
+import itertools
+import threading
+import hashlib
+import wave
 import logging
+from collections import deque
+
+from config import PATHS, KOKORO_CONFIG
 
 logger = logging.getLogger(__name__)
 
+# pid keeps names unique across concurrent AGI processes, counter within one;
+# seeding with the start time keeps a restarted long-lived process off old names
+_rec_counter = itertools.count(int(time.time() * 1000))
+
+def unique_suffix():
+    """Cheap unique file-name suffix - no urandom read per recording"""
+    return f"{os.getpid()}_{next(_rec_counter):x}"
+
+def stat_size(path):
+    """File size from a single stat() - -1 if the file does not exist"""
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return -1
+
+# Canonical WAV header written by MixMonitor/RECORD FILE before PCM data
+WAV_HEADER_BYTES = 44
+
+class MonitorTail:
+    """Incremental reader for a growing MixMonitor WAV - one fd, one reused buffer"""
+
+    def __init__(self, path, buffer_size=65536):
+        self.path = path
+        self.fd = None
+        self.buf = bytearray(buffer_size)
+        self.view = memoryview(self.buf)
+        self._header_left = WAV_HEADER_BYTES
+        self._open_backoff = 0.005
+        self._next_open = 0.0
+
+    def _open(self):
+        """Open the recording once it exists - retries back off to spare path lookups"""
+        now = time.time()
+        if now < self._next_open:
+            return False
+        try:
+            self.fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+            return True
+        except FileNotFoundError:
+            self._next_open = now + self._open_backoff
+            self._open_backoff = min(self._open_backoff * 2, 0.04)
+            return False
+
+    def size(self):
+        """Current file size via the open fd (cached inode), -1 if not created yet"""
+        if self.fd is None and not self._open():
+            return -1
+        return os.fstat(self.fd).st_size
+
+    def read(self):
+        """
+        Return a memoryview over newly appended PCM (empty if nothing new).
+        The view aliases the internal buffer and is only valid until next read.
+        """
+        if self.fd is None and not self._open():
+            return self.view[:0]
+
+        n = os.readv(self.fd, [self.buf])
+        start = 0
+        if self._header_left:
+            start = min(n, self._header_left)
+            self._header_left -= start
+
+        # Keep int16 alignment - leave a trailing odd byte for the next read
+        if (n - start) % 2:
+            os.lseek(self.fd, -1, os.SEEK_CUR)
+            n -= 1
+
+        return self.view[start:n]
+
+    def skip_to_end(self):
+        """Discard everything written so far (e.g. our own TTS during playback)"""
+        while len(self.read()):
+            pass
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_CREATE = 0x00000100
+_INOTIFY_EVENT = struct.Struct('iIII')  # wd, mask, cookie, len - name follows
+_libc = None
+
+def _inotify_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(None, use_errno=True)
+    return _libc
+
+class ModifyWatch:
+    """
+    Block until a file is written (inotify) instead of sleep-polling.
+    Watches the parent directory for create/modify/close-write and filters on
+    the file name, so the watch is live before MixMonitor creates the file.
+    Without inotify, wait() degrades to a 20 ms sleep.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path).encode()
+        self.fd = None
+        self._primed = False
+        self.closed = False  # writer closed the file (IN_CLOSE_WRITE seen)
+        try:
+            fd = _inotify_libc().inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0:
+                wd = _inotify_libc().inotify_add_watch(
+                    fd, os.path.dirname(path).encode() or b'.', IN_CREATE | IN_MODIFY | IN_CLOSE_WRITE)
+                if wd >= 0:
+                    self.fd = fd
+                else:
+                    os.close(fd)
+        except (OSError, AttributeError) as e:
+            logger.debug("inotify unavailable: %s", e)
+
+    def _drain(self):
+        """Read queued events; True if any concerns our file"""
+        hit = False
+        while True:
+            try:
+                data = os.read(self.fd, 4096)
+            except BlockingIOError:
+                return hit
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size
+                if data[offset:offset + length].rstrip(b'\0') == self.name:
+                    hit = True
+                    if mask & IN_CLOSE_WRITE:
+                        self.closed = True
+                offset += length
+
+    def wait(self, timeout):
+        """Wait up to timeout seconds for a write; True if data may have arrived"""
+        if not self._primed:
+            self._primed = True
+            return True  # Writes before the watch existed are not reported
+        if self.fd is None:
+            time.sleep(min(timeout, 0.02))
+            return True
+
+        # Other calls' recordings share the directory - keep waiting past their events
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return False
+            if self._drain():
+                return True
+
+    def wait_closed(self, timeout):
+        """Wait up to timeout seconds for the writer to close the file; False on timeout"""
+        if self.fd is None:
+            return False
+        deadline = time.time() + timeout
+        while True:
+            self._drain()
+            if self.closed:
+                return True
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return False
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+def wait_for_flush(path, max_wait=0.2, settle=0.02, tail=None, watch=None):
+    """
+    Wait until a just-stopped recording is complete (at most max_wait seconds).
+    With a live ModifyWatch on the file this waits for the writer's close;
+    otherwise it returns as soon as two size reads agree. Returns the final
+    size (-1 if missing). A MonitorTail on the file is fstat'ed instead.
+    """
+    if watch is not None and watch.fd is not None:
+        if not watch.wait_closed(max_wait):
+            logger.debug("Recording %s not closed after %.2fs", path, max_wait)
+        return tail.size() if tail is not None else stat_size(path)
+
+    deadline = time.time() + max_wait
+    last_size = -1
+    while True:
+        if tail is not None:
+            size = tail.size()
+        else:
+            size = stat_size(path)
+        if size == last_size or time.time() >= deadline:
+            return size
+        last_size = size
+        time.sleep(settle)
+
+class EnergyVAD:
+    """
+    Energy speech detector over 20 ms frames with N-of-M frame hysteresis.
+    noise_floor=None calibrates from the first calibrate_ms of audio (quietest
+    frame RMS); the effective threshold is max(threshold, floor * floor_margin).
+    """
+
+    def __init__(self, threshold=500, sample_rate=8000, frame_ms=20, frames_needed=2, frames_window=3,
+                 noise_floor=None, floor_margin=3.0, calibrate_ms=200):
+        import numpy as np  # lazy: keeps per-call AGI startup lean
+
+        self._np = np
+        self.threshold = threshold
+        self.floor_margin = floor_margin
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_bytes = self.frame_samples * 2
+        self.frames_needed = frames_needed
+        self._pending = bytearray()
+        self._history = deque(maxlen=frames_window)
+        self.trailing_silence = 0  # consecutive non-speech frames since the last speech frame
+        # One preallocated int64 frame - the dot product cannot overflow
+        self._frame = np.empty(self.frame_samples, dtype=np.int64)
+
+        self.noise_floor = noise_floor
+        self._calibrate_left = 0 if noise_floor is not None else calibrate_ms // frame_ms
+        self._min_energy = None
+        self._set_threshold(threshold if noise_floor is None else max(threshold, noise_floor * floor_margin))
+
+    def _set_threshold(self, rms):
+        # Compare summed squares directly - no sqrt/mean per frame
+        self._energy_threshold = int(rms * rms * self.frame_samples)
+
+    def _frame_energy(self, frame):
+        self._np.copyto(self._frame, self._np.frombuffer(frame, dtype='<i2'))
+        return int(self._np.dot(self._frame, self._frame))
+
+    def feed(self, pcm, scan_all=False):
+        """
+        Consume new PCM; True once enough recent frames are speech.
+        scan_all=True scores every frame (keeps trailing_silence exact for end-of-speech)
+        instead of returning at the first detection.
+        """
+        self._pending += pcm
+        usable = len(self._pending) - len(self._pending) % self.frame_bytes
+        consumed = 0
+        speech = False
+        # Score frames in place - no per-frame slice copies of the pending buffer
+        with memoryview(self._pending) as view:
+            while consumed < usable:
+                with view[consumed:consumed + self.frame_bytes] as frame:
+                    energy = self._frame_energy(frame)
+                consumed += self.frame_bytes
+
+                if self._calibrate_left:
+                    self._calibrate(energy)
+                    continue
+
+                voiced = energy > self._energy_threshold
+                self._history.append(voiced)
+                self.trailing_silence = 0 if voiced else self.trailing_silence + 1
+                if sum(self._history) >= self.frames_needed:
+                    speech = True
+                    if not scan_all:
+                        break
+        del self._pending[:consumed]
+        return speech
+
+    def _calibrate(self, energy):
+        """Track the quietest calibration frame; fix the threshold once done"""
+        if self._min_energy is None or energy < self._min_energy:
+            self._min_energy = energy
+        self._calibrate_left -= 1
+        if not self._calibrate_left:
+            self.noise_floor = (self._min_energy / self.frame_samples) ** 0.5
+            self._set_threshold(max(self.threshold, self.noise_floor * self.floor_margin))
+            logger.info("VAD noise floor %.0f RMS", self.noise_floor)
+
+    def reset(self):
+        self._pending.clear()
+        self._history.clear()
+        self.trailing_silence = 0
+
+# TTS prompts are written to tmpfs and streamed by absolute path (no disk writeback)
+TTS_SOUND_DIR = PATHS["tts_sounds"]
+TTS_SOUND_EXTENSIONS = ('.wav', '.sln16', '.gsm')
+
+# Per-turn files a crashed or hung-up call can leave behind (cache_* prompts are kept)
+TEMP_PREFIXES = ('mix_', 'interrupt_', 'mm_', 'user_', 'tts_')
+# TTS/ASR sox intermediates - temp_dir is usually /dev/shm itself, so only these names
+SCRATCH_DIR = PATHS["temp_dir"]
+SCRATCH_PREFIXES = ('kokoro_temp_', 'kokoro_tts_', 'whisper_')
+_reaper_started = False
+_reaper_lock = threading.Lock()
+
+def _reap_temp_files(targets, max_age):
+    now = time.time()
+    for directory, prefixes in targets:
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.name.startswith(prefixes):
+                        continue
+                    try:
+                        if now - entry.stat().st_mtime > max_age:
+                            os.unlink(entry.path)
+                    except OSError:
+                        pass  # already gone, or owned by another user
+        except OSError as e:
+            logger.debug("Temp reap of %s failed: %s", directory, e)
+
+def start_temp_reaper(targets, max_age=60, interval=30):
+    """
+    Once per process: delete orphaned temp audio older than max_age, now and every
+    interval. targets is a sequence of (directory, name_prefixes) pairs.
+    """
+    global _reaper_started
+    with _reaper_lock:
+        if _reaper_started:
+            return
+        _reaper_started = True
+
+    def run():
+        while True:
+            _reap_temp_files(targets, max_age)
+            time.sleep(interval)
+
+    reaper = threading.Thread(target=run, name="temp-reaper")
+    reaper.daemon = True
+    reaper.start()
+
+def cached_prompt_base(text, voice_type):
+    """Stable tmpfs base path for a fixed phrase - shared by every call process"""
+    # Voice settings are part of the key, so a config change never replays stale audio
+    key = f"{KOKORO_CONFIG['voice']}|{KOKORO_CONFIG['speed']}|{voice_type}|{text}"
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=12).hexdigest()
+    return f"{TTS_SOUND_DIR}/cache_{digest}"
+
+def remove_sound(base):
+    """Delete a played TTS prompt (absolute base path, any extension)"""
+    for ext in TTS_SOUND_EXTENSIONS:
+        try:
+            os.unlink(base + ext)
+            return
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.debug("Sound cleanup failed: %s", e)
+            return
+
+def _is_asterisk_wav(path):
+    """True if path already is 8 kHz mono 16-bit PCM WAV (Kokoro's output format)"""
+    try:
+        with wave.open(path, 'rb') as wav:
+            return (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) == (8000, 1, 2)
+    except (wave.Error, EOFError, OSError):
+        return False
+
+def _kernel_copy(fd_in, fd_out, size):
+    """Copy size bytes without a userspace buffer; returns bytes copied"""
+    copied = 0
+    try:
+        while copied < size:
+            n = os.copy_file_range(fd_in, fd_out, size - copied)
+            if not n:
+                return copied
+            copied += n
+    except OSError:
+        # Older kernels refuse cross-filesystem copy_file_range - sendfile still works
+        while copied < size:
+            n = os.sendfile(fd_out, fd_in, copied, size - copied)
+            if not n:
+                break
+            copied += n
+    return copied
+
+def _place_file(src, dst):
+    """Hardlink src to dst, else copy in-kernel - True on success"""
+    try:
+        os.link(src, dst)
+        return True
+    except OSError as e:
+        logger.debug("Hardlink not possible (%s) - copying in kernel", e)
+
+    try:
+        with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+            size = os.fstat(fin.fileno()).st_size
+            return _kernel_copy(fin.fileno(), fout.fileno(), size) == size
+    except OSError as e:
+        logger.debug("In-kernel copy failed: %s", e)
+        try:
+            os.unlink(dst)
+        except OSError:
+            pass
+        return False
+
 def convert_audio_for_asterisk(input_wav):
-    """Convert to exact Asterisk-compatible format"""
+    """
+    Convert to exact Asterisk-compatible format.
+    Returns the absolute path without extension (as STREAM FILE expects) or None.
+    """
     try:
-        # Create unique timestamp to prevent file collisions
-        unique_id = f"{int(time.time())}_{uuid.uuid4().hex[:8]}"
+        os.makedirs(TTS_SOUND_DIR, mode=0o755, exist_ok=True)
+
+        # Unique across calls and processes - no urandom read per prompt
+        unique_id = unique_suffix()
+
+        # Already in Asterisk format - place the file without running sox
+        if _is_asterisk_wav(input_wav):
+            path = f"{TTS_SOUND_DIR}/tts_{unique_id}.wav"
+            if _place_file(input_wav, path):
+                try:
+                    os.chmod(path, 0o644)
+                except OSError:
+                    pass  # hardlink to a file owned by the model service
+                logger.info("TTS audio placed without conversion: %s", path)
+                return f"{TTS_SOUND_DIR}/tts_{unique_id}"
 
         # Try multiple format approaches
         formats_to_try = [
             {
                 'ext': 'wav',
-                'path': f"/usr/share/asterisk/sounds/tts_{unique_id}.wav",
+                'path': f"{TTS_SOUND_DIR}/tts_{unique_id}.wav",
                 'sox_args': [
                     'sox', input_wav,
                     '-r', '8000',      # 8kHz sample rate
@@ -34,7 +456,7 @@ def convert_audio_for_asterisk(input_wav):
             },
             {
                 'ext': 'sln16',
-                'path': f"/usr/share/asterisk/sounds/tts_{unique_id}.sln16",
+                'path': f"{TTS_SOUND_DIR}/tts_{unique_id}.sln16",
                 'sox_args': [
                     'sox', input_wav,
                     '-r', '8000',      # 8kHz
@@ -46,7 +468,7 @@ def convert_audio_for_asterisk(input_wav):
             },
             {
                 'ext': 'gsm',
-                'path': f"/usr/share/asterisk/sounds/tts_{unique_id}.gsm",
+                'path': f"{TTS_SOUND_DIR}/tts_{unique_id}.gsm",
                 'sox_args': [
                     'sox', input_wav,
                     '-r', '8000',      # 8kHz
@@ -58,20 +480,20 @@ def convert_audio_for_asterisk(input_wav):
 
         for fmt in formats_to_try:
             try:
-                logger.info(f"Trying {fmt['ext']} format...")
+                logger.info("Trying %s format...", fmt['ext'])
 
                 # Add output path to sox command
                 sox_cmd = fmt['sox_args'] + [fmt['path']]
-                logger.info(f"Sox command: {' '.join(sox_cmd)}")
+                logger.info("Sox command: %s", ' '.join(sox_cmd))
 
                 result = subprocess.run(sox_cmd, capture_output=True, text=True, timeout=10)
 
-                if result.returncode == 0 and os.path.exists(fmt['path']):
-                    file_size = os.path.getsize(fmt['path'])
+                file_size = stat_size(fmt['path']) if result.returncode == 0 else -1
+                if file_size >= 0:
                     if file_size > 100:  # Valid file
                         os.chmod(fmt['path'], 0o644)
-                        filename = f"tts_{unique_id}"
-                        logger.info(f"SUCCESS: {fmt['ext']} format created: {filename} ({file_size} bytes)")
+                        filename = f"{TTS_SOUND_DIR}/tts_{unique_id}"
+                        logger.info("SUCCESS: %s format created: %s (%s bytes)", fmt['ext'], filename, file_size)
                         return filename
                     else:
                         logger.warning(f"{fmt['ext']} file too small: {file_size} bytes")
@@ -100,7 +522,7 @@ def convert_audio_for_asterisk(input_wav):
                     break
 
             if template_file:
-                output_path = f"/usr/share/asterisk/sounds/tts_{unique_id}.wav"
+                output_path = f"{TTS_SOUND_DIR}/tts_{unique_id}.wav"
 
                 # Use sox to match the exact format of the working template
                 sox_cmd = [
@@ -113,12 +535,12 @@ def convert_audio_for_asterisk(input_wav):
 
                 result = subprocess.run(sox_cmd, capture_output=True, text=True, timeout=10)
 
-                if result.returncode == 0 and os.path.exists(output_path):
-                    file_size = os.path.getsize(output_path)
+                file_size = stat_size(output_path) if result.returncode == 0 else -1
+                if file_size >= 0:
                     if file_size > 100:
                         os.chmod(output_path, 0o644)
-                        logger.info(f"Template-based conversion success: {file_size} bytes")
-                        return f"tts_{unique_id}"
+                        logger.info("Template-based conversion success: %s bytes", file_size)
+                        return f"{TTS_SOUND_DIR}/tts_{unique_id}"
 
         except Exception as e:
             logger.error(f"Template method failed: {e}")
@@ -4,6 +4,7 @@ Configuration module - Centralized settings and constants
 Extracted from production_agi_voicebot.py
 """
 
+import os
 import sys
 import logging
 
@@ -48,6 +49,7 @@ CONVERSATION_CONFIG = {
     "max_no_response_count": 2,
     "record_timeout": 10,
     "voice_detection_threshold": 300,
+    "vad_rms_threshold": 500,          # 16-bit SLIN RMS per 20 ms frame
     "interrupt_detection_threshold": 200
 }
 
@@ -78,12 +80,50 @@ MODEL_SETTINGS = {
 }
 
 
+# Asterisk Manager Interface - TALK_DETECT events for barge-in
+# Needs a manager.conf user (see extensions_voicebot.conf); without a secret
+# barge-in falls back to MixMonitor polling
+AMI_CONFIG = {
+    "host": "127.0.0.1",
+    "port": 5038,
+    "username": os.environ.get("VOICEBOT_AMI_USER", "voicebot"),
+    "secret": os.environ.get("VOICEBOT_AMI_SECRET", ""),
+    "connect_timeout": 1.0,        # Never delay call setup on a dead AMI
+    "talk_detect": "200,256"       # silence_ms,talking_threshold for TALK_DETECT(set)
+}
+
+# Dialplan helpers shipped in extensions_voicebot.conf
+DIALPLAN_CONFIG = {
+    # Set to "voicebot-play-chunk" once the subroutine is installed in Asterisk
+    "chunk_subroutine": os.environ.get("VOICEBOT_CHUNK_SUBROUTINE") or None,
+    "noise_ms": 200                # continuous noise WaitForNoise needs to call it speech
+}
+
+# FastAGI server - dialplan: AGI(agi://127.0.0.1:4573)
+FASTAGI_CONFIG = {
+    "host": os.environ.get("VOICEBOT_FASTAGI_HOST", "127.0.0.1"),
+    "port": int(os.environ.get("VOICEBOT_FASTAGI_PORT", "4573"))
+}
+
+# Model warm-up service socket (socket_clients <-> model_warmup_service)
+MODEL_SERVICE_CONFIG = {
+    # Per-connection send/receive timeout; generous so slow CPU Whisper/TTS still completes
+    "socket_timeout": float(os.environ.get("VOICEBOT_MODEL_TIMEOUT", "300")),
+    "max_frame_bytes": 16 * 1024 * 1024   # reject corrupt/hostile length prefixes
+}
+
 # File paths
 PATHS = {
     "asterisk_sounds": "/usr/share/asterisk/sounds",
-    "asterisk_monitor": "/var/spool/asterisk/monitor",
+    # Short-lived turn recordings live on tmpfs (/dev/shm is tmpfs on stock Linux);
+    # the directory must be writable by asterisk and the voicebot - the FastAGI unit
+    # creates it setgid asterisk, mode 2775 (netovo-voicebot-fastagi.service)
+    "asterisk_monitor": os.environ.get("ASTERISK_MON_DIR", "/dev/shm/asterisk_mon"),
+    # Per-response TTS prompts - played once by absolute path, then deleted
+    "tts_sounds": os.environ.get("VOICEBOT_TTS_DIR", "/dev/shm/asterisk_tts"),
     "asterisk_log": "/var/log/asterisk/voicebot.log",
-    "temp_dir": "/tmp"
+    # Scratch WAVs of the TTS/ASR service (sox intermediates)
+    "temp_dir": os.environ.get("VOICEBOT_TMPDIR", "/dev/shm")
 }
 
 # Exit phrases for conversation flow
@@ -5,17 +5,50 @@ GPU-accelerated natural voice synthesis for professional voicebot applications
 """
 
 import os
-import time
-import uuid
+import re
 import html
 import logging
+import numpy as np
 import soundfile as sf
 import subprocess
 from kokoro import KPipeline
-from config import KOKORO_CONFIG
+from config import KOKORO_CONFIG, PATHS
+from audio_utils import unique_suffix, stat_size
 
 logger = logging.getLogger(__name__)
 
+# Pronunciation fixes and text normalization, applied in one regex pass
+SPEECH_REPLACEMENTS = {
+    # Acronym spell-outs
+    "AGI": "A-G-I",
+    "API": "A-P-I",
+    "VoIP": "Voice over I-P",
+    "SIP": "S-I-P",
+    # Company name: Netovo (natural, not letter-by-letter)
+    "NETOVO": "Neh-TOH-voh",
+    "Netovo": "Neh-TOH-voh",
+    "netovo": "Neh-TOH-voh",
+    # Basic text normalization
+    "&": " and ",
+    "%": " percent ",
+    "@": " at ",
+    "#": " number ",
+    # Common tech pronunciations
+    "24/7": "twenty-four seven",
+    "3CX": "three C X",
+}
+_SPEECH_RE = re.compile("|".join(
+    re.escape(k) for k in sorted(SPEECH_REPLACEMENTS, key=len, reverse=True)))
+_EMPATHY_PAUSE_RE = re.compile(r" (sorry|understand|apologize|help)(?= )")
+
+# Speech speed per voice type
+VOICE_SPEEDS = {
+    "empathetic": 0.88,    # Slower = more empathetic
+    "technical": 0.94,     # Slightly slower for clarity
+    "greeting": 0.90,      # Warm greeting pace
+    "default": 0.92        # Slightly slower than normal for naturalness
+}
+
 class KokoroTTSClient:
     """Professional Kokoro TTS Client - Natural Voice Synthesis"""
 
@@ -36,7 +69,7 @@ class KokoroTTSClient:
 
             if torch.cuda.is_available():
                 gpu_name = torch.cuda.get_device_name(0)
-                logger.info(f"GPU detected for TTS: {gpu_name}")
+                logger.info("GPU detected for TTS: %s", gpu_name)
                 # Initialize with GPU support
                 self.pipeline = KPipeline(lang_code='a', device=self.device)
             else:
@@ -65,7 +98,7 @@ class KokoroTTSClient:
                 "language": self.language                        # English
             }
 
-            logger.info(f"✅ Kokoro TTS ready: voice={self.kokoro_voice}, GPU={torch.cuda.is_available()}")
+            logger.info("✅ Kokoro TTS ready: voice=%s, GPU=%s", self.kokoro_voice, torch.cuda.is_available())
 
         except Exception as e:
             logger.error(f"Failed to initialize Kokoro TTS: {e}")
@@ -73,49 +106,19 @@ class KokoroTTSClient:
 
     def _get_voice_speed(self, voice_type):
         """Get speech speed based on voice type for natural conversation flow"""
-        speed_map = {
-            "empathetic": 0.88,    # Slower = more empathetic
-            "technical": 0.94,     # Slightly slower for clarity
-            "greeting": 0.90,      # Warm greeting pace
-            "default": 0.92        # Slightly slower than normal for naturalness
-        }
-        return speed_map.get(voice_type, 0.92)
+        return VOICE_SPEEDS.get(voice_type, 0.92)
 
     def _enhance_text_for_speech(self, text, voice_type="default"):
         """Enhance text for more natural speech with pronunciation fixes (safe & minimal)"""
         # Escape any problematic characters (keeps punctuation intact)
         safe_text = html.escape(text, quote=False)
 
-        # --- Acronym spell-outs (unchanged) ---
-        pronunciation_fixes = {
-            "AGI": "A-G-I",
-            "API": "A-P-I",
-            "VoIP": "Voice over I-P",
-            "SIP": "S-I-P",
-        }
-        for original, phonetic in pronunciation_fixes.items():
-            safe_text = safe_text.replace(original, phonetic)
-
-        # --- Company name: Netovo (natural, not letter-by-letter) ---
-        # Works in sentences and before punctuation (.,!?)
-        for v in ("NETOVO", "Netovo", "netovo"):
-            safe_text = safe_text.replace(v, "Neh-TOH-voh")
-
-        # Basic text normalization
-        safe_text = safe_text.replace("&", " and ")
-        safe_text = safe_text.replace("%", " percent ")
-        safe_text = safe_text.replace("@", " at ")
-        safe_text = safe_text.replace("#", " number ")
-
-        # Common tech pronunciations
-        safe_text = safe_text.replace("24/7", "twenty-four seven")
-        safe_text = safe_text.replace("3CX", "three C X")
+        safe_text = _SPEECH_RE.sub(lambda m: SPEECH_REPLACEMENTS[m.group(0)], safe_text)
 
         # Light, optional pausing based on voice type (kept minimal to avoid regressions)
         if voice_type == "empathetic":
-            for w in ("sorry", "understand", "apologize", "help"):
-                # add a gentle comma after the word if present
-                safe_text = safe_text.replace(f" {w} ", f" {w}, ")
+            # add a gentle comma after the word if present
+            safe_text = _EMPATHY_PAUSE_RE.sub(r" \1,", safe_text)
 
         # NOTE: we do NOT force any special handling like "NETOVO." → "…"
         # to avoid re-introducing the letter-by-letter spelling.
@@ -137,12 +140,12 @@ class KokoroTTSClient:
             enhanced_text = self._enhance_text_for_speech(text, voice_type)
 
             # Generate unique output filename
-            unique_id = f"{int(time.time())}_{uuid.uuid4().hex[:8]}"
-            temp_output = f"/tmp/kokoro_temp_{unique_id}.wav"
-            final_output = f"/tmp/kokoro_tts_{unique_id}.wav"
+            unique_id = unique_suffix()
+            temp_output = f"{PATHS['temp_dir']}/kokoro_temp_{unique_id}.wav"
+            final_output = f"{PATHS['temp_dir']}/kokoro_tts_{unique_id}.wav"
 
-            logger.info(f"🎵 Kokoro TTS: voice={voice}, type={voice_type}")
-            logger.info(f"Synthesizing: '{text[:50]}{'...' if len(text) > 50 else ''}'")
+            logger.info("🎵 Kokoro TTS: voice=%s, type=%s", voice, voice_type)
+            logger.info("Synthesizing: '%s%s'", text[:50], '...' if len(text) > 50 else '')
 
             # Generate audio using Kokoro
             generator = self.pipeline(enhanced_text, voice=voice)
@@ -152,17 +155,16 @@ class KokoroTTSClient:
             for i, (gs, ps, audio_chunk) in enumerate(generator):
                 audio_chunks.append(audio_chunk)
                 if i == 0:  # First chunk
-                    logger.debug(f"Kokoro TTS generating audio chunks...")
+                    logger.debug("Kokoro TTS generating audio chunks...")
 
             # Combine all audio chunks
             if audio_chunks:
-                import numpy as np
                 full_audio = np.concatenate(audio_chunks)
 
                 # Save at native sample rate first (24kHz)
                 sf.write(temp_output, full_audio, self.audio_quality["native_sample_rate"], subtype='PCM_16')
 
-                logger.info(f"Generated audio: {len(full_audio)} samples at {self.audio_quality['native_sample_rate']}Hz")
+                logger.info("Generated audio: %s samples at %sHz", len(full_audio), self.audio_quality['native_sample_rate'])
             else:
                 logger.error("No audio generated from Kokoro TTS")
                 return None
@@ -185,9 +187,9 @@ class KokoroTTSClient:
             except:
                 pass
 
-            if convert_result.returncode == 0 and os.path.exists(final_output):
-                file_size = os.path.getsize(final_output)
-                logger.info(f"Kokoro TTS success: {final_output} ({file_size} bytes)")
+            file_size = stat_size(final_output) if convert_result.returncode == 0 else -1
+            if file_size >= 0:
+                logger.info("Kokoro TTS success: %s (%s bytes)", final_output, file_size)
                 return final_output
             else:
                 logger.error(f"Audio conversion failed: {convert_result.stderr}")
@@ -11,7 +11,6 @@ import time
 import signal
 import logging
 import socket
-import json
 import threading
 from pathlib import Path
 
@@ -22,6 +21,8 @@ from config import setup_logging, setup_project_path
 from whisper_asr_client import WhisperASRClient
 from kokoro_tts_client import KokoroTTSClient
 from ollama_client import SimpleOllamaClient
+from audio_utils import start_temp_reaper, SCRATCH_DIR, SCRATCH_PREFIXES
+from socket_clients import send_frame, recv_frame, recv_buffer, encode_message, decode_message
 
 # Set up configuration
 setup_project_path()
@@ -31,6 +32,10 @@ logger = logging.getLogger(__name__)
 # Socket configuration
 SOCKET_PATH = "/tmp/netovo_models.sock"
 
+def _error(message):
+    """Error response sent back to the socket client"""
+    return {'status': 'error', 'message': message}
+
 class ModelWarmupService:
     """Service to keep models warm and serve requests via Unix socket"""
 
@@ -41,6 +46,13 @@ class ModelWarmupService:
         self.asr_client = None
         self.ollama_client = None
         self.socket_server = None
+        # action -> handler(request) returning the response dict
+        self._handlers = {
+            'synthesize': self._handle_synthesize,
+            'transcribe': self._handle_transcribe,
+            'generate': self._handle_generate,
+            'health': self._handle_health,
+        }
 
     def signal_handler(self, signum, frame):
         """Handle shutdown signals gracefully"""
@@ -161,67 +173,73 @@ class ModelWarmupService:
             logger.error(f"Socket setup failed: {e}")
             return False
 
-    def _handle_client_request(self, client_socket):
-        """Handle individual client request"""
+    def _handle_synthesize(self, request):
+        """TTS: text -> Asterisk-ready WAV path"""
+        text = request.get('text', '')
+        voice_type = request.get('voice_type', 'default')
+
+        if not text:
+            return _error('No text provided')
+        tts_file = self.tts_client.synthesize(text, voice_type=voice_type)
+        if tts_file:
+            return {'status': 'success', 'file_path': tts_file}
+        return _error('TTS synthesis failed')
+
+    def _handle_transcribe(self, request):
+        """ASR: recorded WAV -> transcript"""
+        audio_file = request.get('audio_file', '')
+
+        if audio_file and os.path.exists(audio_file):
+            transcript = self.asr_client.transcribe_file(audio_file)
+            return {'status': 'success', 'transcript': transcript or ''}
+        return _error('Audio file not found')
+
+    def _handle_generate(self, request):
+        """LLM: prompt -> reply text"""
+        prompt = request.get('prompt', '')
+
+        if not prompt:
+            return _error('No prompt provided')
+        ai_response = self.ollama_client.generate(prompt)
+        return {'status': 'success', 'response': ai_response or ''}
+
+    def _handle_health(self, request):
+        """Liveness probe"""
+        return {'status': 'success', 'models_loaded': self.models_loaded}
+
+    def _dispatch(self, request):
+        handler = self._handlers.get(request.get('action'))
+        if handler is None:
+            return _error('Unknown action')
+        return handler(request)
+
+    def _process_request(self, data):
+        """Decode one request, dispatch it and return the encoded response"""
         try:
-            # Receive request
-            data = client_socket.recv(4096).decode('utf-8')
-            if not data:
-                return
-
-            request = json.loads(data)
-            action = request.get('action')
-
-            response = {'status': 'error', 'message': 'Unknown action'}
+            request = decode_message(data)
 
             if not self.models_loaded:
-                response = {'status': 'error', 'message': 'Models not loaded'}
-
-            elif action == 'synthesize':
-                text = request.get('text', '')
-                voice_type = request.get('voice_type', 'default')
-
-                if text:
-                    tts_file = self.tts_client.synthesize(text, voice_type=voice_type)
-                    if tts_file:
-                        response = {'status': 'success', 'file_path': tts_file}
-                    else:
-                        response = {'status': 'error', 'message': 'TTS synthesis failed'}
-                else:
-                    response = {'status': 'error', 'message': 'No text provided'}
-
-            elif action == 'transcribe':
-                audio_file = request.get('audio_file', '')
-
-                if audio_file and os.path.exists(audio_file):
-                    transcript = self.asr_client.transcribe_file(audio_file)
-                    response = {'status': 'success', 'transcript': transcript or ''}
-                else:
-                    response = {'status': 'error', 'message': 'Audio file not found'}
+                response = _error('Models not loaded')
+            else:
+                response = self._dispatch(request)
 
-            elif action == 'generate':
-                prompt = request.get('prompt', '')
-
-                if prompt:
-                    ai_response = self.ollama_client.generate(prompt)
-                    response = {'status': 'success', 'response': ai_response or ''}
-                else:
-                    response = {'status': 'error', 'message': 'No prompt provided'}
-
-            elif action == 'health':
-                response = {'status': 'success', 'models_loaded': self.models_loaded}
-
-            # Send response
-            response_json = json.dumps(response)
-            client_socket.send(response_json.encode('utf-8'))
+            return encode_message(response)
 
         except Exception as e:
             logger.error(f"Client request handling failed: {e}")
-            try:
-                error_response = json.dumps({'status': 'error', 'message': str(e)})
-                client_socket.send(error_response.encode('utf-8'))
-            except:
-                pass
+            return encode_message(_error(str(e)))
+
+    def _handle_client_request(self, client_socket):
+        """Serve length-prefixed requests on one client connection until it closes"""
+        buf = recv_buffer()
+        try:
+            while True:
+                data = recv_frame(client_socket, buf)
+                if data is None:
+                    break
+                send_frame(client_socket, self._process_request(data))
+        except Exception as e:
+            logger.debug("Client connection closed: %s", e)
         finally:
             client_socket.close()
 
@@ -233,7 +251,7 @@ class ModelWarmupService:
             try:
                 if self.socket_server:
                     client_socket, addr = self.socket_server.accept()
-                    # Handle each request in a separate thread for concurrent access
+                    # One thread per client connection; clients keep connections open across requests
                     client_thread = threading.Thread(
                         target=self._handle_client_request,
                         args=(client_socket,)
@@ -273,6 +291,9 @@ class ModelWarmupService:
         socket_thread.daemon = True
         socket_thread.start()
 
+        # TTS/ASR scratch files are created here - sweep the ones an aborted request left
+        start_temp_reaper(((SCRATCH_DIR, SCRATCH_PREFIXES),))
+
         logger.info("🎯 Service ready - models loaded, socket server running")
 
         # Keep service alive with periodic health checks
@@ -5,6 +5,7 @@ Sends voicebot data to existing n8n workflow for Atera ticket creation
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 import threading
 from datetime import datetime
@@ -14,6 +15,10 @@ logger = logging.getLogger(__name__)
 
 N8N_WEBHOOK_URL = "http://localhost:5678/webhook/create-ticket"
 
+# One keep-alive pool for every ticket POST (background threads share it)
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0))
+
 
 def create_ticket_via_n8n_blocking(
     caller_id: str,
@@ -57,7 +62,7 @@ def create_ticket_via_n8n_blocking(
 
         logger.info(f"Creating ticket via n8n: severity={severity}, product={product_family}, caller={caller_id}")
 
-        response = requests.post(
+        response = _session.post(
             N8N_WEBHOOK_URL,
             json=payload,
             timeout=10.0
@@ -20,6 +20,8 @@ class SimpleOllamaClient:
         self.settings = MODEL_SETTINGS.get(model_name, MODEL_SETTINGS["phi4"])
         self.conversation_history = []
         self.greeting_given = False
+        # Reused across turns so the localhost connection stays alive
+        self.http = httpx.Client(timeout=15.0)
 
     def generate(self, prompt, max_tokens=150):
         """Generate response with enhanced conversation context"""
@@ -38,25 +40,28 @@ class SimpleOllamaClient:
                 }
             }
 
-            with httpx.Client(timeout=15.0) as client:
-                response = client.post("http://localhost:11434/api/generate", json=payload)
-                response.raise_for_status()
-                result = response.json()
-                text = result.get("response", "").strip()
+            response = self.http.post("http://localhost:11434/api/generate", json=payload)
+            response.raise_for_status()
+            result = response.json()
+            text = result.get("response", "").strip()
 
-                text = self._validate_and_clean_response(text, prompt)
-                self.conversation_history.append({"user": prompt, "bot": text})
+            text = self._validate_and_clean_response(text, prompt)
+            self.conversation_history.append({"user": prompt, "bot": text})
 
-                if len(self.conversation_history) > 10:
-                    self.conversation_history = self.conversation_history[-8:]
+            if len(self.conversation_history) > 10:
+                self.conversation_history = self.conversation_history[-8:]
 
-                logger.info(f"Ollama response: {text[:50]}")
-                return text
+            logger.info("Ollama response: %s", text[:50])
+            return text
 
         except Exception as e:
             logger.error(f"Ollama error: {e}")
             return "I'm having technical difficulties. How else can I help?"
 
+    def close(self):
+        """Release the pooled HTTP connection"""
+        self.http.close()
+
     def _build_context(self, prompt):
         """Build the conversation context"""
         context = f"""You are Alexis, a professional AI support assistant for Netovo.
@@ -140,7 +145,7 @@ After creating ticket, provide professional closure:
 
     def _validate_and_clean_response(self, text, user_input):
         """Validate response relevance and clean up artifacts"""
-        logger.debug(f"Cleaning response: {text[:20]}")
+        logger.debug("Cleaning response: %s", text[:20])
         if not text:
             return "I'm sorry, could you please repeat that?"
 
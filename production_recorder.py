@@ -6,9 +6,12 @@ Industry standard for VoIP call recording - designed for production reliability
 
 import os
 import time
-import uuid
 import logging
 
+from audio_utils import MonitorTail, ModifyWatch, EnergyVAD, wait_for_flush, unique_suffix
+from agi_interface import MONITOR_DIR
+from config import CONVERSATION_CONFIG
+
 logger = logging.getLogger(__name__)
 
 class ProductionCallRecorder:
@@ -18,75 +21,98 @@ class ProductionCallRecorder:
         self.agi = agi
         self.asr = asr_client
 
+    def _new_vad(self):
+        # The first turn calibrates the line's noise floor; later turns reuse it
+        return EnergyVAD(threshold=CONVERSATION_CONFIG["vad_rms_threshold"],
+                         noise_floor=self.agi.noise_floor)
+
+    def _keep_noise_floor(self, vad):
+        if self.agi.noise_floor is None and vad.noise_floor is not None:
+            self.agi.noise_floor = vad.noise_floor
+
     def get_user_input_with_mixmonitor(self, timeout=10):
         """
         Production-grade user input recording using MixMonitor
         Records actual call audio stream (RTP) - not hardware devices
         """
-        unique_id = f"{int(time.time())}_{uuid.uuid4().hex[:4]}"
-        record_file = f"/var/spool/asterisk/monitor/mix_{unique_id}"
+        unique_id = unique_suffix()
+        record_file = f"{MONITOR_DIR}/mix_{unique_id}"
         wav_file = f"{record_file}.wav"
 
-        logger.info(f"Starting MixMonitor recording: {record_file}")
+        logger.info("Starting MixMonitor recording: %s", record_file)
 
         try:
             # Start MixMonitor - records call audio stream (both directions)
             # Records both inbound (user speech) and outbound (TTS) audio
-            mixmonitor_cmd = f'EXEC MixMonitor {record_file}.wav'
-            result = self.agi.command(mixmonitor_cmd)
+            result = self.agi.start_mixmonitor(record_file)
 
-            if not result or not result.startswith('200'):
-                logger.error(f"Failed to start MixMonitor: {result}")
+            if not result.ok:
+                logger.error("Failed to start MixMonitor: %s", result)
                 return None
 
-            logger.info(f"MixMonitor started, waiting {timeout}s for user input...")
+            logger.info("MixMonitor started, waiting %ss for user input...", timeout)
 
             # Wait for user to speak (end-of-speech with silence window + max cap)
             max_utterance_sec = 30.0        # hard cap on a single user turn
-            eos_silence_ms = 1200           # end-of-speech window (~1.2s)
-            poll_ms = 100                   # check 10x per second
-            growth_min_bytes = 512          # treat as “voice activity” if file grows by this
-
-            record_start = time.time()
-            last_growth_t = record_start
-            last_size = 0
-
-            while True:
-                if not self.agi.connected:
-                    logger.info("Call disconnected during recording")
-                    break
-
-                now = time.time()
-                elapsed = now - record_start
-                if elapsed > max_utterance_sec:
-                    logger.info("Max utterance cap reached")
-                    break
-
-                if os.path.exists(wav_file):
-                    size = os.path.getsize(wav_file)
-                    if size > last_size + growth_min_bytes:
-                        last_growth_t = now     # speech happening (or resumed)
-                        last_size = size
-
-                # end-of-speech: enough silence since last growth
-                if (now - last_growth_t) * 1000.0 >= eos_silence_ms:
-                    if last_size >= 1000:      # only stop if we actually got speech
-                        logger.info("EOS silence reached; stopping recording")
-                        break
+            eos_silence_frames = 30         # end-of-speech: 30 silent 20 ms frames (600 ms)
+            poll_ms = 100                   # upper bound between loop checks
 
-                time.sleep(poll_ms / 1000.0)
+            # VAD on the recorded PCM itself - nothing is playing, so it is caller audio
+            tail = MonitorTail(wav_file)
+            watch = ModifyWatch(wav_file)
+            vad = self._new_vad()
 
-            # Stop MixMonitor
-            stop_result = self.agi.command('EXEC StopMixMonitor')
-            logger.info(f"MixMonitor stopped: {stop_result}")
+            record_start = time.time()
+            heard_speech = False
 
-            # Small delay to ensure file is written
-            time.sleep(0.2)
+            try:
+                try:
+                    while True:
+                        if not self.agi.connected:
+                            logger.info("Call disconnected during recording")
+                            break
+
+                        now = time.time()
+                        elapsed = now - record_start
+                        if elapsed > max_utterance_sec:
+                            logger.info("Max utterance cap reached")
+                            break
+
+                        if not heard_speech and elapsed > timeout:
+                            logger.info("No speech within input timeout")
+                            break
+
+                        # Sleep in the kernel until MixMonitor writes, then score every new frame
+                        if watch.wait(poll_ms / 1000.0) and vad.feed(tail.read(), scan_all=True):
+                            heard_speech = True
+
+                        # end-of-speech: counted in recorded frames, not wall-clock time
+                        if heard_speech and vad.trailing_silence >= eos_silence_frames:
+                            logger.info("EOS silence reached; stopping recording")
+                            break
+                finally:
+                    self._keep_noise_floor(vad)
+
+                # Stop MixMonitor
+                stop_result = self.agi.stop_mixmonitor()
+                logger.info("MixMonitor stopped: %s", stop_result)
+
+                # Wait for MixMonitor to close the file before ASR reads it
+                file_size = wait_for_flush(wav_file, tail=tail, watch=watch)
+            finally:
+                watch.close()
+                tail.close()
+
+            if not heard_speech:
+                try:
+                    os.unlink(wav_file)
+                except OSError:
+                    pass
+                return None
 
             # Check final recording
-            if os.path.exists(wav_file):
-                file_size = os.path.getsize(wav_file)
-                logger.info(f"Final recording: {file_size} bytes")
+            if file_size >= 0:
+                logger.info("Final recording: %d bytes", file_size)
 
                 if file_size > 300:  # Lower threshold for better detection
                     # Transcribe with ASR
@@ -96,11 +122,11 @@ class ProductionCallRecorder:
                     try:
                         os.unlink(wav_file)
                     except Exception as e:
-                        logger.debug(f"Cleanup failed: {e}")
+                        logger.debug("Cleanup failed: %s", e)
 
                     return transcript.strip() if transcript else None
                 else:
-                    logger.info(f"Recording too small: {file_size} bytes")
+                    logger.info("Recording too small: %d bytes", file_size)
                     # Cleanup small/empty file
                     try:
                         os.unlink(wav_file)
@@ -115,9 +141,8 @@ class ProductionCallRecorder:
             logger.error(f"MixMonitor recording error: {e}")
             # Ensure cleanup
             try:
-                self.agi.command('EXEC StopMixMonitor')
-                if os.path.exists(wav_file):
-                    os.unlink(wav_file)
+                self.agi.stop_mixmonitor()
+                os.unlink(wav_file)
             except:
                 pass
             return None
@@ -127,39 +152,42 @@ class ProductionCallRecorder:
         Record with voice interruption capability using MixMonitor
         Used for detecting user speech during TTS playback
         """
-        unique_id = f"{int(time.time())}_{uuid.uuid4().hex[:4]}"
-        record_file = f"/var/spool/asterisk/monitor/interrupt_{unique_id}"
+        unique_id = unique_suffix()
+        record_file = f"{MONITOR_DIR}/interrupt_{unique_id}"
         wav_file = f"{record_file}.wav"
 
-        logger.info(f"Starting interrupt detection: {record_file}")
+        logger.info("Starting interrupt detection: %s", record_file)
 
         try:
             # Start MixMonitor for interrupt detection (both directions)
-            mixmonitor_cmd = f'EXEC MixMonitor {record_file}.wav'
-            result = self.agi.command(mixmonitor_cmd)
+            result = self.agi.start_mixmonitor(record_file)
 
-            if not result or not result.startswith('200'):
-                logger.error(f"Failed to start interrupt MixMonitor: {result}")
+            if not result.ok:
+                logger.error("Failed to start interrupt MixMonitor: %s", result)
                 return False, None
 
             # Wait for timeout or voice detection
+            tail = MonitorTail(wav_file)
+            watch = ModifyWatch(wav_file)
+            vad = self._new_vad()
             start_time = time.time()
-            while time.time() - start_time < timeout:
-                if not self.agi.connected:
-                    break
+            try:
+                while True:
+                    remaining = timeout - (time.time() - start_time)
+                    if remaining <= 0 or not self.agi.connected:
+                        break
 
-                # Check for voice activity
-                if os.path.exists(wav_file):
-                    file_size = os.path.getsize(wav_file)
-                    if file_size > 200:  # Voice detected - lower threshold
-                        logger.info(f"Voice interrupt detected: {file_size} bytes")
+                    # Check for voice activity on the recorded frames
+                    if watch.wait(min(remaining, 0.1)) and vad.feed(tail.read()):
+                        logger.info("Voice interrupt detected after %.2fs", time.time() - start_time)
 
                         # Stop recording
-                        self.agi.command('EXEC StopMixMonitor')
-                        time.sleep(0.1)
+                        self.agi.stop_mixmonitor()
+                        file_size = wait_for_flush(wav_file, max_wait=0.1, tail=tail, watch=watch)
+                        tail.close()
 
                         # Transcribe interruption
-                        if os.path.exists(wav_file):
+                        if file_size >= 0:
                             transcript = self.asr.transcribe_file(wav_file)
 
                             # Cleanup
@@ -170,18 +198,18 @@ class ProductionCallRecorder:
 
                             if transcript and len(transcript.strip()) > 1:
                                 return True, transcript.strip()
-                            else:
-                                return True, "VOICE_DETECTED"
-
-                time.sleep(0.1)  # Check every 100ms for fast response
+                        return True, "VOICE_DETECTED"
+            finally:
+                watch.close()
+                tail.close()
+                self._keep_noise_floor(vad)
 
             # No interruption detected
-            self.agi.command('EXEC StopMixMonitor')
+            self.agi.stop_mixmonitor()
 
             # Cleanup
             try:
-                if os.path.exists(wav_file):
-                    os.unlink(wav_file)
+                os.unlink(wav_file)
             except:
                 pass
 
@@ -191,9 +219,8 @@ class ProductionCallRecorder:
             logger.error(f"Interrupt recording error: {e}")
             # Cleanup
             try:
-                self.agi.command('EXEC StopMixMonitor')
-                if os.path.exists(wav_file):
-                    os.unlink(wav_file)
+                self.agi.stop_mixmonitor()
+                os.unlink(wav_file)
             except:
                 pass
             return False, None
@@ -6,39 +6,154 @@ Provides same interface as original clients but with zero model loading
 """
 
 import os
+import queue
 import socket
+import struct
 import json
 import logging
+import threading
+
+from config import MODEL_SERVICE_CONFIG
 
 logger = logging.getLogger(__name__)
 
 SOCKET_PATH = "/tmp/netovo_models.sock"
 
+# Kernel send/receive timeout per connection - longer than the slowest model call
+SOCKET_TIMEOUT = MODEL_SERVICE_CONFIG["socket_timeout"]
+MAX_FRAME_BYTES = MODEL_SERVICE_CONFIG["max_frame_bytes"]
+
+# Connected sockets shared by every client in the process; one request/response
+# in flight per connection
+_pool = queue.LifoQueue(maxsize=8)
+
+# Every message is a 4-byte big-endian length followed by the JSON body
+_FRAME_HEADER = struct.Struct('>I')
+
+# orjson encodes straight to bytes and parses memoryviews in place; stdlib json is the fallback
+try:
+    import orjson
+
+    encode_message = orjson.dumps
+    decode_message = orjson.loads
+except ImportError:
+    def encode_message(obj):
+        return json.dumps(obj).encode('utf-8')
+
+    def decode_message(data):
+        return json.loads(bytes(data))
+
+# Fixed-payload requests, encoded once
+_HEALTH_REQUEST = encode_message({'action': 'health'})
+
+# Receive buffer size kept per thread; larger messages get a one-off buffer
+RECV_BUFFER_SIZE = 65536
+_recv_buffers = threading.local()
+
+def recv_buffer():
+    """This thread's reusable receive buffer"""
+    buf = getattr(_recv_buffers, 'buf', None)
+    if buf is None:
+        buf = _recv_buffers.buf = bytearray(RECV_BUFFER_SIZE)
+    return buf
+
+def _fill(sock, view):
+    got = 0
+    while got < len(view):
+        count = sock.recv_into(view[got:])
+        if not count:
+            raise ConnectionError("Connection closed mid-message")
+        got += count
+
+def recv_exact(sock, n, buf=None):
+    """Read exactly n bytes into buf (if big enough) and return a memoryview of them"""
+    if buf is None or len(buf) < n:
+        buf = bytearray(n)
+    view = memoryview(buf)[:n]
+    _fill(sock, view)
+    return view
+
+def send_frame(sock, payload):
+    """Send one length-prefixed message"""
+    sock.sendall(_FRAME_HEADER.pack(len(payload)) + payload)
+
+def recv_frame(sock, buf=None):
+    """
+    Receive one length-prefixed message; None on a clean close between messages.
+    The body is a memoryview into buf, valid until buf is used again.
+    """
+    if buf is None:
+        buf = bytearray(_FRAME_HEADER.size)
+    header = memoryview(buf)[:_FRAME_HEADER.size]
+    count = sock.recv_into(header)
+    if not count:
+        return None
+    if count < _FRAME_HEADER.size:
+        _fill(sock, header[count:])
+    (length,) = _FRAME_HEADER.unpack_from(header)
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {length} bytes exceeds limit of {MAX_FRAME_BYTES}")
+    return recv_exact(sock, length, buf)
+
 class SocketClient:
     """Base socket client for communication with model service"""
 
     def __init__(self):
         self.socket_path = SOCKET_PATH
-        logger.info(f"Socket client initialized - connecting to {self.socket_path}")
+        logger.info("Socket client initialized - connecting to %s", self.socket_path)
 
-    def _send_request(self, request_data):
-        """Send request to socket server and get response"""
+    def _connect(self):
+        client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         try:
-            # Create socket connection
-            client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            # Set once per connection; a stuck service raises instead of hanging the call
+            seconds = int(SOCKET_TIMEOUT)
+            timeval = struct.pack('ll', seconds, int((SOCKET_TIMEOUT - seconds) * 1e6))
+            client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, timeval)
+            client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, timeval)
             client_socket.connect(self.socket_path)
-
-            # Send request
-            request_json = json.dumps(request_data)
-            client_socket.send(request_json.encode('utf-8'))
-
-            # Receive response
-            response_data = client_socket.recv(4096).decode('utf-8')
+        except Exception:
             client_socket.close()
+            raise
+        return client_socket
+
+    def _exchange(self, conn, payload):
+        send_frame(conn, payload)
+        body = recv_frame(conn, recv_buffer())
+        if body is None:
+            raise ConnectionError("Model service closed the connection")
+        return decode_message(body)
 
-            response = json.loads(response_data)
+    def _send_request(self, request_data):
+        """Send request (dict, or pre-encoded JSON bytes) to socket server and get response"""
+        if isinstance(request_data, bytes):
+            payload = request_data
+        else:
+            payload = encode_message(request_data)
+        try:
+            try:
+                conn, reused = _pool.get_nowait(), True
+            except queue.Empty:
+                conn, reused = self._connect(), False
+
+            while True:
+                try:
+                    response = self._exchange(conn, payload)
+                    break
+                except Exception as e:
+                    self._discard(conn)
+                    if not reused or not isinstance(e, ConnectionError):
+                        raise
+                    # Pooled connection went stale (service restarted) - retry once on a fresh one
+                    conn, reused = self._connect(), False
+
+            self._release(conn)
             return response
 
+        except (BlockingIOError, TimeoutError):
+            # SO_RCVTIMEO/SO_SNDTIMEO expiry surfaces as EAGAIN on a blocking socket
+            logger.error(f"Model service did not answer within {SOCKET_TIMEOUT:g}s")
+            return {'status': 'error', 'message': 'Model service timeout'}
+
         except FileNotFoundError:
             logger.error(f"Socket not found: {self.socket_path}")
             logger.error("Make sure model warmup service is running!")
@@ -48,6 +163,36 @@ class SocketClient:
             logger.error(f"Socket communication failed: {e}")
             return {'status': 'error', 'message': str(e)}
 
+    def _call(self, request, result_key, default, label):
+        """Send request; the result field on success, default (logged) on failure"""
+        response = self._send_request(request)
+        if response.get('status') == 'success':
+            return response.get(result_key, default)
+        logger.error(f"{label} failed: {response.get('message', 'Unknown error')}")
+        return default
+
+    @staticmethod
+    def _release(conn):
+        try:
+            _pool.put_nowait(conn)
+        except queue.Full:
+            SocketClient._discard(conn)
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+    def close(self):
+        """Close every pooled connection to the model service"""
+        while True:
+            try:
+                self._discard(_pool.get_nowait())
+            except queue.Empty:
+                return
+
 class KokoroSocketClient(SocketClient):
     """Socket-based Kokoro TTS Client - Zero model loading overhead"""
 
@@ -72,20 +217,14 @@ class KokoroSocketClient(SocketClient):
             'voice_type': voice_type
         }
 
-        response = self._send_request(request)
-
-        if response.get('status') == 'success':
-            file_path = response.get('file_path')
-            if file_path and os.path.exists(file_path):
-                logger.info(f"TTS success via socket: {file_path}")
-                return file_path
-            else:
-                logger.error(f"TTS file not found: {file_path}")
-                return None
-        else:
-            error_msg = response.get('message', 'Unknown error')
-            logger.error(f"TTS synthesis failed: {error_msg}")
+        file_path = self._call(request, 'file_path', None, "TTS synthesis")
+        if file_path is None:
             return None
+        if os.path.exists(file_path):
+            logger.info("TTS success via socket: %s", file_path)
+            return file_path
+        logger.error(f"TTS file not found: {file_path}")
+        return None
 
 class WhisperSocketClient(SocketClient):
     """Socket-based Whisper ASR Client - Zero model loading overhead"""
@@ -109,16 +248,10 @@ class WhisperSocketClient(SocketClient):
             'audio_file': audio_file
         }
 
-        response = self._send_request(request)
-
-        if response.get('status') == 'success':
-            transcript = response.get('transcript', '')
-            logger.info(f"ASR success via socket: '{transcript[:50]}...'")
-            return transcript
-        else:
-            error_msg = response.get('message', 'Unknown error')
-            logger.error(f"ASR transcription failed: {error_msg}")
-            return ""
+        transcript = self._call(request, 'transcript', "", "ASR transcription")
+        if transcript:
+            logger.info("ASR success via socket: '%s...'", transcript[:50])
+        return transcript
 
     def transcribe(self, audio_file):
         """Alias for transcribe_file for compatibility"""
@@ -146,22 +279,16 @@ class OllamaSocketClient(SocketClient):
             'prompt': prompt.strip()
         }
 
-        response = self._send_request(request)
-
-        if response.get('status') == 'success':
-            ai_response = response.get('response', '')
-            logger.info(f"Ollama success via socket: '{ai_response[:50]}...'")
-            return ai_response
-        else:
-            error_msg = response.get('message', 'Unknown error')
-            logger.error(f"Ollama generation failed: {error_msg}")
-            return ""
+        ai_response = self._call(request, 'response', "", "Ollama generation")
+        if ai_response:
+            logger.info("Ollama success via socket: '%s...'", ai_response[:50])
+        return ai_response
 
 def test_socket_connection():
     """Test connection to socket server"""
     try:
         client = SocketClient()
-        response = client._send_request({'action': 'health'})
+        response = client._send_request(_HEALTH_REQUEST)
 
         if response.get('status') == 'success':
             models_loaded = response.get('models_loaded', False)
@@ -0,0 +1,15 @@
+#!/home/aiadmin/netovo_voicebot/venv/bin/python3
+"""
+VoiceBot FastAGI Server - Long-lived entry point
+One process serves every call (models, sockets and imports stay warm).
+Dialplan: exten => s,n,AGI(agi://127.0.0.1:4573)
+"""
+
+from config import FASTAGI_CONFIG
+from agi_interface import SimpleAGI
+from voicebot_main import handle_call, initialize_models_persistent
+
+if __name__ == "__main__":
+    # Long-lived server: connect to the model service once, before the first call
+    initialize_models_persistent()
+    SimpleAGI.serve_fastagi(handle_call, FASTAGI_CONFIG["host"], FASTAGI_CONFIG["port"])
@@ -8,8 +8,8 @@ import os
 import time
 import logging
 import re
-import asyncio
-from datetime import datetime
+import queue
+import threading
 
 # Import configuration and utilities
 from config import (
@@ -22,9 +22,9 @@ from socket_clients import KokoroSocketClient as KokoroTTSClient
 from socket_clients import WhisperSocketClient as WhisperASRClient
 from socket_clients import OllamaSocketClient as SimpleOllamaClient
 from socket_clients import test_socket_connection
-from agi_interface import SimpleAGI, FastInterruptRecorder
+from agi_interface import SimpleAGI
 from production_recorder import ProductionCallRecorder
-from audio_utils import convert_audio_for_asterisk
+from audio_utils import convert_audio_for_asterisk, remove_sound, cached_prompt_base
 from n8n_webhook import create_ticket_via_n8n, format_transcript, extract_customer_name
 
 # Set up configuration
@@ -39,6 +39,61 @@ _ollama_client = None
 _models_loaded = False
 _model_load_lock = False
 
+# Fixed phrases - synthesized once, then replayed from the tmpfs prompt cache
+GREETING_TEXT = "Hello, thank you for calling Netovo. I'm Alexis. How can I help you?"
+GOODBYE_TEXT = "Thank you for calling Netovo. Have a great day!"
+URGENT_TEXT = "I understand this is urgent. Let me transfer you to our priority support team immediately."
+NO_RESPONSE_TEXT = "I haven't heard from you in our conversation. I'll end this call now. Thank you for calling Netovo."
+TRANSFER_TEXT = "I'm having trouble hearing you clearly. Let me transfer you to a human agent who can better assist you."
+REPEAT_TEXT = "I didn't catch that. Could you speak up or repeat your question?"
+CACHED_PROMPTS = frozenset([
+    GREETING_TEXT, GOODBYE_TEXT, URGENT_TEXT, NO_RESPONSE_TEXT, TRANSFER_TEXT, REPEAT_TEXT
+])
+
+# One sentence (or a trailing fragment) plus its whitespace - punctuation only
+# ends a sentence before whitespace, so 192.168.1.1 and 2.5 stay whole
+_SENT = re.compile(r'.+?(?:[.!?]+(?=\s|$)|$)\s*', re.S)
+
+
+def _keyword_re(words):
+    """One compiled alternation - a single scan instead of one `in` per keyword"""
+    return re.compile('|'.join(map(re.escape, words)))
+
+
+# Ticket markers emitted by the LLM
+_TICKET_MARKER = re.compile(r'\[CREATE_TICKET:\s*severity=([^,]+),\s*product=([^\]]+)\]', re.IGNORECASE)
+_LEGACY_TICKET_MARKER = re.compile(r'\[CREATE_TICKET:\s*severity=(\w+)\]', re.IGNORECASE)
+
+# Fallback ticket detection (matched against lowercased text)
+_TECH_ISSUE = _keyword_re([
+    'not working', 'broken', 'down', 'can\'t access', 'problem with',
+    'issue with', 'error', 'help with', 'fix', 'printer', 'email',
+    'computer', 'server', 'network', 'password', 'login', 'software'
+])
+_AI_HELPING = _keyword_re([
+    'help you', 'assist', 'troubleshoot', 'fix that', 'resolve',
+    'let me', 'i can help', 'support'
+])
+_HIGH_SEVERITY = _keyword_re(['emergency', 'urgent', 'critical', 'down', 'asap'])
+_CRITICAL_SEVERITY = _keyword_re(['all users', 'entire', 'everyone'])
+
+# Caller intents and reply voice types, compiled once from config (first match wins)
+_EXIT_INTENT = _keyword_re(EXIT_PHRASES)
+_URGENT_INTENT = _keyword_re(URGENT_PHRASES)
+_VOICE_TYPE_KEYWORDS = tuple(
+    (_keyword_re(words), voice_type) for voice_type, words in VOICE_TYPES.items() if words
+)
+
+# First match wins
+_PRODUCT_FAMILIES = (
+    (_keyword_re(['email', 'outlook', 'mail', 'exchange']), 'Email'),
+    (_keyword_re(['printer', 'print', 'printing', 'paper', 'toner']), 'Printing'),
+    (_keyword_re(['network', 'internet', 'wifi', 'connection', 'router']), 'Network'),
+    (_keyword_re(['password', 'login', 'access', 'account']), 'Security'),
+    (_keyword_re(['software', 'application', 'program', 'app', 'system']), 'Software'),
+    (_keyword_re(['computer', 'laptop', 'desktop', 'hardware', 'device']), 'Hardware'),
+)
+
 def initialize_socket_clients():
     """Initialize socket clients - instant connection to persistent models"""
     global _tts_client, _asr_client, _ollama_client, _models_loaded
@@ -67,7 +122,7 @@ def initialize_socket_clients():
 
         total_time = time.time() - start_time
         _models_loaded = True
-        logger.info(f"✅ SOCKET CLIENTS READY in {total_time:.3f}s - Connected to persistent models!")
+        logger.info("✅ SOCKET CLIENTS READY in %.3fs - Connected to persistent models!", total_time)
 
     except Exception as e:
         logger.error(f"Socket client initialization failed: {e}")
@@ -97,20 +152,16 @@ def determine_voice_type(response_text):
     response_lower = response_text.lower()
 
     # 🎯 Choose voice type based on response content for more natural conversation
-    if any(word in response_lower for word in ["sorry", "apologize", "understand"]):
-        return "empathetic"
-    elif any(word in response_lower for word in ["let's", "try", "check", "restart"]):
-        return "helping"
-    elif any(word in response_lower for word in ["driver", "system", "update", "windows"]):
-        return "technical"
-    else:
-        return "default"
+    for keywords, voice_type in _VOICE_TYPE_KEYWORDS:
+        if keywords.search(response_lower):
+            return voice_type
+    return "default"
 
 def check_exit_conditions(transcript, response, no_response_count, failed_interactions, start_time):
     """Check various exit conditions and return (should_exit, exit_reason)"""
 
     # 1. User requested goodbye/transfer
-    if transcript and any(phrase in transcript.lower() for phrase in EXIT_PHRASES):
+    if transcript and _EXIT_INTENT.search(transcript.lower()):
         return True, "user_exit"
 
     # 2. AI response indicates conversation end
@@ -131,36 +182,173 @@ def check_exit_conditions(transcript, response, no_response_count, failed_intera
 
     return False, None
 
-def handle_greeting(agi, tts, asr, ollama):
-    """Handle the initial greeting and any interruptions - INSTANT via socket"""
-    logger.info("Playing greeting (instant via persistent TTS)...")
-    greeting_text = "Hello, thank you for calling Netovo. I'm Alexis. How can I help you?"
+def prepare_prompt(tts, text, voice_type):
+    """
+    Synthesize text into a playable prompt.
+    Returns (base_path, temporary) - temporary prompts are deleted after playback,
+    fixed phrases stay in the prompt cache. (None, False) if TTS failed.
+    """
+    cache_base = None
+    if text in CACHED_PROMPTS:
+        cache_base = cached_prompt_base(text, voice_type)
+        if os.path.exists(f"{cache_base}.wav"):
+            logger.info("Prompt cache hit")
+            return cache_base, False
+
+    # Generate TTS via socket (models already loaded, so fast)
+    tts_file = tts.synthesize(text, voice_type=voice_type)
+    if not tts_file or not os.path.exists(tts_file):
+        logger.error("TTS synthesis failed")
+        return None, False
+
+    asterisk_file = convert_audio_for_asterisk(tts_file)
+
+    # Cleanup TTS file
+    try:
+        os.unlink(tts_file)
+    except Exception as e:
+        logger.debug("TTS file cleanup failed: %s", e)
 
-    # Generate greeting TTS via socket (models already loaded, so fast)
-    tts_file = tts.synthesize(greeting_text, voice_type="greeting")
+    if not asterisk_file:
+        logger.error("Audio conversion failed")
+        return None, False
 
-    greeting_transcript = None
-    if tts_file and os.path.exists(tts_file):
-        asterisk_file = convert_audio_for_asterisk(tts_file)
+    if cache_base:
+        try:
+            # Atomic publish - concurrent calls either see the whole file or none
+            os.rename(f"{asterisk_file}.wav", f"{cache_base}.wav")
+            return cache_base, False
+        except OSError as e:
+            logger.debug("Prompt not cached: %s", e)
+    return asterisk_file, True
+
+def _chunk_text_for_tts(text, max_chars=140):
+    """Greedily pack whole sentences into chunks of about max_chars for barge-in playback"""
+    chunks = []
+    buf = ''
+    for match in _SENT.finditer(text):
+        sentence = match.group()
+        if buf and len(buf) + len(sentence) > max_chars:
+            chunks.append(buf.strip())
+            buf = sentence
+        else:
+            buf += sentence
+    if buf.strip():
+        chunks.append(buf.strip())
+    return chunks
+
+def _synthesize_ahead(tts, texts, voice_type, ready, stop):
+    """Producer: synthesize chunks into the bounded queue while earlier ones play"""
+    try:
+        for text in texts:
+            if stop.is_set():
+                return
+            base, temporary = prepare_prompt(tts, text, voice_type)
+            if not base:
+                continue
+            while True:
+                try:
+                    ready.put((base, temporary), timeout=0.1)
+                    break
+                except queue.Full:
+                    if stop.is_set():
+                        # Playback ended early - nobody will play (or clean up) this one
+                        if temporary:
+                            remove_sound(base)
+                        return
+    except Exception as e:
+        logger.error(f"Chunk synthesis failed: {e}")
+    finally:
+        # End-of-stream must not be dropped: the queue is usually full when synthesis finishes
+        while not stop.is_set():
+            try:
+                ready.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+
+def speak_response(agi, tts, response, voice_type):
+    """
+    Play a response chunk by chunk, listening for the caller between chunks.
+    Chunk N+1 is synthesized on a producer thread while chunk N plays.
+    Returns (played, detected_speech).
+    """
+    # Fixed phrases stay whole so they hit the prompt cache
+    texts = [response] if response in CACHED_PROMPTS else _chunk_text_for_tts(response)
+
+    ready = queue.Queue(maxsize=2)
+    stop = threading.Event()
+    producer = threading.Thread(target=_synthesize_ahead, args=(tts, texts, voice_type, ready, stop))
+    producer.daemon = True
+    producer.start()
 
-        # Cleanup TTS file
+    temporaries = []
+
+    def prompts():
+        while True:
+            try:
+                item = ready.get(timeout=0.5)
+            except queue.Empty:
+                if producer.is_alive() or not ready.empty():
+                    continue
+                return  # producer exited without an end marker
+            if item is None:
+                return
+            base, temporary = item
+            if stop.is_set():
+                # Arrived after playback ended (prefetch of a chunk never played)
+                if temporary:
+                    remove_sound(base)
+                return
+            if temporary:
+                temporaries.append(base)
+            yield base
+
+    # Peek the first chunk so a total TTS failure still falls back to a stock prompt
+    chunks = prompts()
+    first = next(chunks, None)
+    if first is None:
+        return False, False
+
+    def playback():
+        yield first
+        yield from chunks
+
+    try:
+        played_all, detected_speech = agi.play_response_with_barge_in(playback())
+    finally:
+        stop.set()
+        while True:
+            try:
+                item = ready.get_nowait()
+            except queue.Empty:
+                break
+            if item and item[1]:
+                remove_sound(item[0])
         try:
-            os.unlink(tts_file)
-        except Exception as e:
-            logger.debug(f"TTS file cleanup failed: {e}")
-
-        if asterisk_file:
-            success, interrupt = agi.play_with_voice_interrupt(asterisk_file, asr)
-            if interrupt and isinstance(interrupt, str) and len(interrupt) > 2:
-                logger.info(f"Greeting interrupted by voice: {interrupt[:30]}...")
-                greeting_transcript = interrupt
-            elif interrupt:
-                logger.info("Greeting interrupted by voice")
-            else:
-                logger.info(f"Greeting played: {success}")
+            ready.put_nowait(None)  # wake a pending prefetch of the next chunk
+        except queue.Full:
+            pass
+        for base in temporaries:
+            remove_sound(base)
+    return True, detected_speech
+
+def handle_greeting(agi, tts, asr, ollama):
+    """Handle the initial greeting and any interruptions - INSTANT via socket"""
+    logger.info("Playing greeting (instant via persistent TTS)...")
+    greeting_transcript = None
+    asterisk_file, temporary = prepare_prompt(tts, GREETING_TEXT, "greeting")
+    if asterisk_file:
+        success, interrupt = agi.play_with_voice_interrupt(asterisk_file, asr)
+        if temporary:
+            remove_sound(asterisk_file)
+        if interrupt and isinstance(interrupt, str) and len(interrupt) > 2:
+            logger.info("Greeting interrupted by voice: %s...", interrupt[:30])
+            greeting_transcript = interrupt
+        elif interrupt:
+            logger.info("Greeting interrupted by voice")
         else:
-            logger.error("Audio conversion failed")
-            agi.stream_file("demo-thanks")
+            logger.info("Greeting played: %s", success)
     else:
         logger.error("TTS greeting failed")
         agi.stream_file("demo-thanks")
@@ -170,7 +358,7 @@ def handle_greeting(agi, tts, asr, ollama):
         logger.info("Processing greeting interruption...")
         # Add to conversation context and generate response
         response = ollama.generate(greeting_transcript)
-        logger.info(f"Response to interruption: {response[:30]}...")
+        logger.info("Response to interruption: %s...", response[:30])
     else:
         logger.info("Greeting complete - ready for conversation")
 
@@ -182,38 +370,36 @@ def detect_ticket_request(ai_response: str, user_input: str = "") -> tuple:
         (should_create_ticket, ticket_data, cleaned_response)
     """
     # Primary: Check for [CREATE_TICKET: severity=level, product=type]
-    pattern = r'\[CREATE_TICKET:\s*severity=([^,]+),\s*product=([^\]]+)\]'
-    match = re.search(pattern, ai_response, re.IGNORECASE)
+    match = _TICKET_MARKER.search(ai_response)
 
     if match:
         severity = match.group(1).strip().lower()
         product = match.group(2).strip()
 
         # Remove marker from response
-        cleaned = re.sub(pattern, '', ai_response, flags=re.IGNORECASE).strip()
+        cleaned = _TICKET_MARKER.sub('', ai_response).strip()
 
         ticket_data = {
             'severity': severity,
             'product_family': product
         }
 
-        logger.info(f"🎫 Primary ticket detected: severity={severity}, product={product}")
+        logger.info("🎫 Primary ticket detected: severity=%s, product=%s", severity, product)
         return True, ticket_data, cleaned
 
     # Fallback: Old format for compatibility
-    old_pattern = r'\[CREATE_TICKET:\s*severity=(\w+)\]'
-    old_match = re.search(old_pattern, ai_response, re.IGNORECASE)
+    old_match = _LEGACY_TICKET_MARKER.search(ai_response)
 
     if old_match:
         severity = old_match.group(1).lower()
-        cleaned = re.sub(old_pattern, '', ai_response, flags=re.IGNORECASE).strip()
+        cleaned = _LEGACY_TICKET_MARKER.sub('', ai_response).strip()
 
         ticket_data = {
             'severity': severity,
             'product_family': 'General'  # Default fallback
         }
 
-        logger.info(f"🎫 Legacy ticket detected: severity={severity}")
+        logger.info("🎫 Legacy ticket detected: severity=%s", severity)
         return True, ticket_data, cleaned
 
     # FALLBACK DETECTION: If Phi4 forgot to add marker but customer clearly has tech issue
@@ -221,22 +407,9 @@ def detect_ticket_request(ai_response: str, user_input: str = "") -> tuple:
         user_lower = user_input.lower()
         ai_lower = ai_response.lower()
 
-        # Technical issue keywords in user input
-        tech_keywords = [
-            'not working', 'broken', 'down', 'can\'t access', 'problem with',
-            'issue with', 'error', 'help with', 'fix', 'printer', 'email',
-            'computer', 'server', 'network', 'password', 'login', 'software'
-        ]
-
-        # AI helping indicators
-        help_indicators = [
-            'help you', 'assist', 'troubleshoot', 'fix that', 'resolve',
-            'let me', 'i can help', 'support'
-        ]
-
         # Check if user mentioned technical issue AND AI is trying to help
-        user_has_tech_issue = any(keyword in user_lower for keyword in tech_keywords)
-        ai_is_helping = any(indicator in ai_lower for indicator in help_indicators)
+        user_has_tech_issue = _TECH_ISSUE.search(user_lower) is not None
+        ai_is_helping = _AI_HELPING.search(ai_lower) is not None
 
         if user_has_tech_issue and ai_is_helping:
             # Determine product family from user input
@@ -244,9 +417,9 @@ def detect_ticket_request(ai_response: str, user_input: str = "") -> tuple:
 
             # Determine severity (default to medium unless keywords suggest otherwise)
             severity = 'medium'
-            if any(word in user_lower for word in ['emergency', 'urgent', 'critical', 'down', 'asap']):
+            if _HIGH_SEVERITY.search(user_lower):
                 severity = 'high'
-            elif any(word in user_lower for word in ['all users', 'entire', 'everyone']):
+            elif _CRITICAL_SEVERITY.search(user_lower):
                 severity = 'critical'
 
             ticket_data = {
@@ -266,20 +439,10 @@ def detect_product_family_from_text(text: str) -> str:
     """Detect product family from user text"""
     text_lower = text.lower()
 
-    if any(word in text_lower for word in ['email', 'outlook', 'mail', 'exchange']):
-        return 'Email'
-    elif any(word in text_lower for word in ['printer', 'print', 'printing', 'paper', 'toner']):
-        return 'Printing'
-    elif any(word in text_lower for word in ['network', 'internet', 'wifi', 'connection', 'router']):
-        return 'Network'
-    elif any(word in text_lower for word in ['password', 'login', 'access', 'account']):
-        return 'Security'
-    elif any(word in text_lower for word in ['software', 'application', 'program', 'app', 'system']):
-        return 'Software'
-    elif any(word in text_lower for word in ['computer', 'laptop', 'desktop', 'hardware', 'device']):
-        return 'Hardware'
-    else:
-        return 'General'
+    for keywords, family in _PRODUCT_FAMILIES:
+        if keywords.search(text_lower):
+            return family
+    return 'General'
 
 def conversation_loop(agi, tts, asr, ollama, recorder):
     """Main conversation loop"""
@@ -294,7 +457,7 @@ def conversation_loop(agi, tts, asr, ollama, recorder):
     ticket_number = None
 
     for turn in range(max_turns):
-        logger.info(f"Conversation turn {turn + 1}")
+        logger.info("Conversation turn %s", turn + 1)
 
         # Use production recorder for user input (MixMonitor)
         transcript = recorder.get_user_input_with_mixmonitor(
@@ -306,7 +469,7 @@ def conversation_loop(agi, tts, asr, ollama, recorder):
             break
 
         if transcript:
-            logger.info(f"User said: {transcript}")
+            logger.info("User said: %s", transcript)
             failed_interactions = 0
             no_response_count = 0
 
@@ -314,11 +477,12 @@ def conversation_loop(agi, tts, asr, ollama, recorder):
             messages.append({'role': 'user', 'content': transcript})
 
             # Check for USER exit intents (not AI responses)
-            if any(phrase in transcript.lower() for phrase in EXIT_PHRASES):
-                response = "Thank you for calling Netovo. Have a great day!"
+            transcript_lower = transcript.lower()
+            if _EXIT_INTENT.search(transcript_lower):
+                response = GOODBYE_TEXT
                 # This will trigger exit after response
-            elif any(phrase in transcript.lower() for phrase in URGENT_PHRASES):
-                response = "I understand this is urgent. Let me transfer you to our priority support team immediately."
+            elif _URGENT_INTENT.search(transcript_lower):
+                response = URGENT_TEXT
                 # This will trigger exit after response
             else:
                 # Normal AI response
@@ -332,8 +496,8 @@ def conversation_loop(agi, tts, asr, ollama, recorder):
                 create_ticket, ticket_data, cleaned_response = detect_ticket_request(response, transcript)
 
                 if create_ticket and ticket_data and not ticket_created:
-                    logger.info(f"🎫 AI determined ticket is ready: {ticket_data}")
-                    logger.info(f"📋 Creating comprehensive ticket with {len(messages)} conversation turns")
+                    logger.info("🎫 AI determined ticket is ready: %s", ticket_data)
+                    logger.info("📋 Creating comprehensive ticket with %s conversation turns", len(messages))
 
                     # Create one comprehensive ticket with full conversation
                     create_ticket_via_n8n(
@@ -347,14 +511,14 @@ def conversation_loop(agi, tts, asr, ollama, recorder):
                     ticket_created = True
                     ticket_number = "AUTO-GENERATED"  # Will be replaced by actual ticket ID
 
-                    logger.info(f"✅ Comprehensive ticket created - no more tickets for this call")
+                    logger.info("✅ Comprehensive ticket created - no more tickets for this call")
 
                     # Use AI-cleaned response (should include professional confirmation)
                     response = cleaned_response
 
                 elif create_ticket and ticket_created:
                     # AI tried to create another ticket - ignore and clean response
-                    logger.info(f"⚠️ AI tried to create duplicate ticket - ignored (ticket already exists)")
+                    logger.info("⚠️ AI tried to create duplicate ticket - ignored (ticket already exists)")
                     response = cleaned_response.replace("[CREATE_TICKET", "[TICKET_ALREADY_EXISTS")
 
             except Exception as e:
@@ -367,11 +531,11 @@ def conversation_loop(agi, tts, asr, ollama, recorder):
 
             # Handle no response scenarios
             if no_response_count >= 2:
-                response = "I haven't heard from you in our conversation. I'll end this call now. Thank you for calling Netovo."
+                response = NO_RESPONSE_TEXT
             elif failed_interactions >= 3:
-                response = "I'm having trouble hearing you clearly. Let me transfer you to a human agent who can better assist you."
+                response = TRANSFER_TEXT
             else:
-                response = "I didn't catch that. Could you speak up or repeat your question?"
+                response = REPEAT_TEXT
 
         # Check exit conditions
         should_exit, exit_reason = check_exit_conditions(
@@ -379,37 +543,22 @@ def conversation_loop(agi, tts, asr, ollama, recorder):
         )
 
         # Speak response
-        logger.info(f"Responding: {response[:30]}...")
+        logger.info("Responding: %s...", response[:30])
 
         voice_type = determine_voice_type(response)
-        tts_file = tts.synthesize(response, voice_type=voice_type)
+        played, detected_speech = speak_response(agi, tts, response, voice_type)
         interrupt_transcript = None
 
-        if tts_file and os.path.exists(tts_file):
-            asterisk_file = convert_audio_for_asterisk(tts_file)
-
-            try:
-                os.unlink(tts_file)
-            except Exception as e:
-                logger.debug(f"TTS file cleanup failed: {e}")
-
-            if asterisk_file:
-                success, interrupt = agi.play_with_voice_interrupt(asterisk_file, asr)
-                if interrupt and isinstance(interrupt, str) and len(interrupt) > 2:
-                    logger.info(f"Response interrupted by voice: {interrupt[:30]}...")
-                    interrupt_transcript = interrupt
-                elif interrupt:
-                    logger.info("Response interrupted by voice")
-                    # Get user input since we detected voice but no transcript
-                    transcript = recorder.get_user_input_with_mixmonitor(timeout=8)
-                    if transcript:
-                        interrupt_transcript = transcript
-            else:
-                # Fallback to built-in sound
-                agi.stream_file("demo-thanks")
-        else:
+        if not played:
             # Fallback to built-in sound
             agi.stream_file("demo-thanks")
+        elif detected_speech:
+            logger.info("Response interrupted by voice")
+            # Capture what the caller is saying over the rest of the response
+            transcript = recorder.get_user_input_with_mixmonitor(timeout=8)
+            agi.barge_in_outcome(bool(transcript))
+            if transcript:
+                interrupt_transcript = transcript
 
         # If response was interrupted, process the new input immediately
         if interrupt_transcript:
@@ -419,7 +568,7 @@ def conversation_loop(agi, tts, asr, ollama, recorder):
 
         # Check exit conditions after response
         if should_exit:
-            logger.info(f"Exiting conversation: {exit_reason}")
+            logger.info("Exiting conversation: %s", exit_reason)
             break
 
         # Check if call is still connected
@@ -427,25 +576,19 @@ def conversation_loop(agi, tts, asr, ollama, recorder):
             logger.info("Call disconnected - ending conversation")
             break
 
-        agi.sleep(1)
+        # No pause here - the recorder's end-of-speech window already paces turns
 
-def main():
-    """Main AGI handler"""
+def handle_call(agi):
+    """Run one call on a connected SimpleAGI (stdin AGI or a FastAGI connection)"""
     try:
-        logger.info("=== FAST AGI VoiceBot Starting ===")
-
-        # Initialize AGI and answer IMMEDIATELY (before loading models)
-        agi = SimpleAGI()
         caller_id = agi.env.get('agi_callerid', 'Unknown')
-        logger.info(f"Call from: {caller_id}")
+        logger.info("Call from: %s", caller_id)
 
-        # Answer call FIRST - no delays
-        if not agi.answer():
+        # Answer call FIRST - no delays (banner rides in the same AGI batch)
+        if not agi.answer(banner="VoiceBot Active - Loading..."):
             logger.error("Failed to answer")
             return
 
-        agi.verbose("VoiceBot Active - Loading...")
-
         # Get TTS first for immediate greeting
         tts, asr, ollama = get_preloaded_clients()
 
@@ -477,24 +620,27 @@ def main():
         logger.error(f"Traceback: {traceback.format_exc()}")
 
         try:
-            agi = SimpleAGI()
-            agi.answer()
-            agi.verbose("VoiceBot error")
-            agi.sleep(1)
-            agi.hangup()
+            if agi.connected:
+                agi.verbose("VoiceBot error")
+                agi.sleep(1)
+                agi.hangup()
         except Exception as e:
             logger.error(f"Error cleanup failed: {e}")
+    finally:
+        # Runs on every exit path, whether or not HANGUP was sent or succeeded
+        agi.close()
 
-# *** PROFESSIONAL CUSTOMER SERVICE: SOCKET CLIENTS FOR PERSISTENT MODELS ***
-logger.info("=== VoiceBot Starting - Socket clients for persistent models ===")
+def main():
+    """Main AGI handler"""
+    logger.info("=== FAST AGI VoiceBot Starting ===")
 
-# Initialize socket clients (instant connection to persistent models)
-try:
-    initialize_models_persistent()
-    logger.info("=== VoiceBot Ready - Connected to persistent models via socket ===")
-except Exception as e:
-    logger.error(f"Socket client initialization failed: {e}")
-    logger.info("=== VoiceBot Ready - Clients will initialize on first call ===")
+    # Initialize AGI and answer IMMEDIATELY (before loading models)
+    try:
+        agi = SimpleAGI()
+    except Exception as e:
+        logger.error(f"AGI setup failed: {e}")
+        return
+    handle_call(agi)
 
 if __name__ == "__main__":
     main()
@@ -5,13 +5,14 @@ GPU-accelerated speech-to-text for professional voicebot applications
 """
 
 import os
-import time
-import uuid
+import struct
 import subprocess
 import logging
+import numpy as np
 import whisper
 import torch
-from config import WHISPER_CONFIG
+from config import WHISPER_CONFIG, PATHS
+from audio_utils import unique_suffix, stat_size
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +26,7 @@ class WhisperASRClient:
             self.sample_rate = WHISPER_CONFIG["sample_rate"]
             self.language = WHISPER_CONFIG["language"]
 
-            logger.info(f"Loading Whisper {self.model_size} model for professional ASR...")
+            logger.info("Loading Whisper %s model for professional ASR...", self.model_size)
 
             # Load Whisper model (auto-downloads if needed)
             self.model = whisper.load_model(self.model_size)
@@ -37,7 +38,7 @@ class WhisperASRClient:
             if torch.cuda.is_available() and self.device == "cuda":
                 gpu_name = torch.cuda.get_device_name(0)
                 gpu_memory = torch.cuda.get_device_properties(0).total_memory / 1024**3
-                logger.info(f"GPU detected: {gpu_name} ({gpu_memory:.1f}GB)")
+                logger.info("GPU detected: %s (%.1fGB)", gpu_name, gpu_memory)
 
                 # Move model to GPU for faster inference
                 if hasattr(self.model, 'to'):
@@ -45,7 +46,7 @@ class WhisperASRClient:
             else:
                 logger.warning("CUDA not available - using CPU (slower)")
 
-            logger.info(f"✅ Whisper ASR ready: model={self.model_size}, device={self.device}")
+            logger.info("✅ Whisper ASR ready: model=%s, device=%s", self.model_size, self.device)
 
         except Exception as e:
             logger.error(f"Failed to initialize Whisper ASR: {e}")
@@ -53,12 +54,12 @@ class WhisperASRClient:
 
     def _validate_audio_file(self, audio_file):
         """Validate audio file exists and has content"""
-        if not os.path.exists(audio_file):
+        file_size = stat_size(audio_file)
+        if file_size < 0:
             logger.error(f"Audio file not found: {audio_file}")
             return False
 
-        file_size = os.path.getsize(audio_file)
-        logger.info(f"Audio file: {audio_file} ({file_size} bytes)")
+        logger.info("Audio file: %s (%s bytes)", audio_file, file_size)
 
         if file_size < 100:  # Very small files are likely empty/corrupted
             logger.error(f"Audio file too small: {file_size} bytes")
@@ -70,15 +71,15 @@ class WhisperASRClient:
         """Convert audio to Whisper-compatible format if needed"""
         try:
             # Create unique temp file
-            unique_id = f"{int(time.time())}_{uuid.uuid4().hex[:8]}"
-            converted_path = f"/tmp/whisper_{unique_id}.wav"
+            unique_id = unique_suffix()
+            converted_path = f"{PATHS['temp_dir']}/whisper_{unique_id}.wav"
 
             # Get original file info
             try:
                 file_cmd = subprocess.run(['file', audio_file], capture_output=True, text=True, timeout=5)
-                logger.info(f"Original file type: {file_cmd.stdout.strip()}")
+                logger.info("Original file type: %s", file_cmd.stdout.strip())
             except Exception as e:
-                logger.debug(f"Could not get file info: {e}")
+                logger.debug("Could not get file info: %s", e)
 
             # Convert to Whisper-preferred format (16kHz mono)
             sox_cmd = [
@@ -90,7 +91,7 @@ class WhisperASRClient:
                 converted_path
             ]
 
-            logger.info(f"Converting audio: {' '.join(sox_cmd)}")
+            logger.info("Converting audio: %s", ' '.join(sox_cmd))
             convert_result = subprocess.run(sox_cmd, capture_output=True, text=True, timeout=15)
 
             if convert_result.returncode != 0:
@@ -106,77 +107,150 @@ class WhisperASRClient:
                     pass
                 return None
 
-            logger.info(f"Audio converted successfully: {converted_path}")
+            logger.info("Audio converted successfully: %s", converted_path)
             return converted_path
 
         except Exception as e:
             logger.error(f"Audio conversion error: {e}")
             return None
 
+    def _load_pcm_wav(self, audio_file):
+        """
+        Read a 16-bit PCM WAV straight into memory - no sox process, no temp file.
+        Sizes in the header are ignored and PCM is read to end of file: MixMonitor
+        only fills them in when it closes the recording.
+        Returns (samples, sample_rate) or None for formats that need sox.
+        """
+        with open(audio_file, 'rb') as f:
+            raw = f.read()
+        if raw[:4] != b'RIFF' or raw[8:12] != b'WAVE':
+            return None
+
+        # Walk the RIFF chunks: format from 'fmt ', PCM from 'data' to EOF
+        fmt = None
+        pos = 12
+        while pos + 8 <= len(raw):
+            chunk_id = raw[pos:pos + 4]
+            chunk_size = int.from_bytes(raw[pos + 4:pos + 8], 'little')
+            pos += 8
+            if chunk_id == b'data':
+                break
+            if chunk_id == b'fmt ' and chunk_size >= 16:
+                fmt = struct.unpack_from('<HHI6xH', raw, pos)
+            pos += chunk_size + (chunk_size & 1)
+        else:
+            return None
+
+        if fmt is None:
+            return None
+        audio_format, channels, sample_rate, bits = fmt
+        if audio_format != 1 or bits != 16 or not channels:
+            logger.debug("In-memory WAV read not possible: format %s, %s-bit", audio_format, bits)
+            return None
+
+        count = (len(raw) - pos) // (2 * channels) * channels
+        samples = np.frombuffer(raw, dtype='<i2', offset=pos, count=count)
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+        return samples, sample_rate
+
+    def transcribe_pcm(self, samples, sample_rate=8000):
+        """
+        Transcribe PCM already in memory (int16 or float32 samples)
+        Returns transcribed text string
+        """
+        try:
+            audio = np.asarray(samples)
+            if audio.dtype != np.float32:
+                audio = audio.astype(np.float32) / 32768.0
+
+            # Whisper expects 16 kHz - telephony audio is 8 kHz
+            if sample_rate != self.sample_rate and audio.size:
+                n_out = int(audio.size * self.sample_rate / sample_rate)
+                audio = np.interp(
+                    np.linspace(0, audio.size - 1, n_out),
+                    np.arange(audio.size),
+                    audio
+                ).astype(np.float32)
+
+            return self._run_whisper(audio)
+
+        except Exception as e:
+            logger.error(f"Whisper PCM transcription error: {e}")
+            return ""
+
+    def _run_whisper(self, audio_input):
+        """Run Whisper on a file path or 16 kHz float32 array and clean the result"""
+        # Transcribe with Whisper - optimized for GPU
+        # GPU optimization options:
+        # - fp16=True for H100 GPU (faster inference)
+        # - language="en" for English-only processing (faster)
+        # - task="transcribe" for transcription (not translation)
+        # - beam_size=5 for better accuracy on GPU
+        use_fp16 = torch.cuda.is_available() and self.device == "cuda"
+
+        result = self.model.transcribe(
+            audio_input,
+            fp16=use_fp16,        # Use FP16 on GPU for speed
+            language="en",        # English only (faster)
+            task="transcribe",    # Transcription mode
+            verbose=False,        # Less verbose output
+            beam_size=5,          # Better accuracy (GPU can handle it)
+            best_of=5,           # Multiple candidates for better results
+            temperature=0.0       # Deterministic output
+        )
+
+        # Extract and clean transcript
+        transcript = result.get("text", "").strip()
+
+        if transcript:
+            # Clean the transcript
+            cleaned_transcript = self._clean_transcript(transcript)
+            if cleaned_transcript:
+                logger.info("Whisper ASR result: '%s'", cleaned_transcript)
+                return cleaned_transcript
+            else:
+                logger.warning("Transcript cleaning resulted in empty text")
+                return ""
+        else:
+            logger.warning("Whisper returned no transcription")
+            return ""
+
     def transcribe_file(self, audio_file):
         """
         Professional speech-to-text transcription
         Returns transcribed text string with high accuracy
         """
         try:
-            logger.info(f"Whisper ASR transcribing: {audio_file}")
+            logger.info("Whisper ASR transcribing: %s", audio_file)
 
             # Validate original file first
             if not self._validate_audio_file(audio_file):
                 return ""
 
-            # Convert audio for optimal Whisper processing
+            # Fast path: 16-bit PCM WAV (MixMonitor/RECORD FILE) decoded in memory
+            pcm = self._load_pcm_wav(audio_file)
+            if pcm is not None:
+                samples, sample_rate = pcm
+                logger.info("Running Whisper on in-memory PCM (%s samples @ %sHz)", samples.size, sample_rate)
+                return self.transcribe_pcm(samples, sample_rate)
+
+            # Other formats: convert with sox for optimal Whisper processing
             converted_file = self._convert_audio_for_whisper(audio_file)
             if not converted_file:
                 logger.error("Audio conversion failed")
                 return ""
 
-            # Use converted file for transcription
-            audio_to_process = converted_file
-
-            logger.info(f"Running Whisper transcription on: {audio_to_process}")
-
-            # Transcribe with Whisper - optimized for GPU
-            # GPU optimization options:
-            # - fp16=True for H100 GPU (faster inference)
-            # - language="en" for English-only processing (faster)
-            # - task="transcribe" for transcription (not translation)
-            # - beam_size=5 for better accuracy on GPU
-            use_fp16 = torch.cuda.is_available() and self.device == "cuda"
-
-            result = self.model.transcribe(
-                audio_to_process,
-                fp16=use_fp16,        # Use FP16 on GPU for speed
-                language="en",        # English only (faster)
-                task="transcribe",    # Transcription mode
-                verbose=False,        # Less verbose output
-                beam_size=5,          # Better accuracy (GPU can handle it)
-                best_of=5,           # Multiple candidates for better results
-                temperature=0.0       # Deterministic output
-            )
-
-            # Cleanup temp file immediately
+            logger.info("Running Whisper transcription on: %s", converted_file)
             try:
-                if converted_file and os.path.exists(converted_file):
-                    os.unlink(converted_file)
-            except Exception as e:
-                logger.debug(f"Temp file cleanup failed: {e}")
-
-            # Extract and clean transcript
-            transcript = result.get("text", "").strip()
-
-            if transcript:
-                # Clean the transcript
-                cleaned_transcript = self._clean_transcript(transcript)
-                if cleaned_transcript:
-                    logger.info(f"Whisper ASR result: '{cleaned_transcript}'")
-                    return cleaned_transcript
-                else:
-                    logger.warning("Transcript cleaning resulted in empty text")
-                    return ""
-            else:
-                logger.warning("Whisper returned no transcription")
-                return ""
+                return self._run_whisper(converted_file)
+            finally:
+                # Cleanup temp file immediately
+                try:
+                    if os.path.exists(converted_file):
+                        os.unlink(converted_file)
+                except Exception as e:
+                    logger.debug("Temp file cleanup failed: %s", e)
 
         except Exception as e:
             logger.error(f"Whisper ASR error: {e}")